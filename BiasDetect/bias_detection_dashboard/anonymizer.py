@@ -0,0 +1,204 @@
+import argparse
+import hashlib
+import os
+import secrets
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from privacy_checker import PrivacyChecker
+from tracer import traced
+
+HASH = 'hash'
+MASK = 'mask'
+GENERALIZE = 'generalize'
+DROP = 'drop'
+METHODS = [HASH, MASK, GENERALIZE, DROP]
+
+EMAIL_PATTERN = r'@\S+\.\S+'
+PHONE_PATTERN = r'(?:\D*\d){7}'
+
+# Without BIAS_DASHBOARD_ANON_KEY, pseudonyms are stable for the lifetime of this process only
+_process_key = secrets.token_bytes(32)
+
+
+def _default_key():
+    key = os.environ.get('BIAS_DASHBOARD_ANON_KEY')
+    return key.encode() if key else _process_key
+
+
+def _on_uniques(series, transform):
+    """Apply ``transform`` to the distinct values only and broadcast back; missing values stay missing."""
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return series
+    values = np.asarray(transform(pd.Series(uniques)), dtype=object)
+    result = values.take(np.maximum(codes, 0))
+    result[codes < 0] = None
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def hash_values(series, key, length=12):
+    """Keyed BLAKE2 pseudonyms: equal inputs map to equal tokens, which cannot be reversed without the key."""
+    def transform(uniques):
+        return [hashlib.blake2b(str(value).encode(), key=key, digest_size=length // 2).hexdigest() for value in uniques]
+    return _on_uniques(series, transform)
+
+
+def mask_values(series):
+    """Keep the shape but hide the content: ``a***@domain.com``, ``***-***-0301``, ``A***``."""
+    def transform(uniques):
+        text = uniques.astype(str)
+        email = text.str.contains(EMAIL_PATTERN)
+        phone = ~email & text.str.match(PHONE_PATTERN)
+        masked = text.str[:1] + '***'
+        masked[email] = text[email].str.replace(r'^(.)[^@]*', r'\1***', regex=True)
+        masked[phone] = text[phone].str.replace(r'\d(?=(?:\D*\d){4})', '*', regex=True)
+        return masked
+    return _on_uniques(series, transform)
+
+
+def generalize_values(series, width=10):
+    """Coarsen values: numbers to ``width``-wide bands, emails to their domain, phones to the area code, text to an initial."""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        lower = np.floor(series.astype(float) / width) * width
+        bands = lower.map(lambda value: f"{value:g}-{value + width - 1:g}" if pd.notna(value) else None)
+        return bands.rename(series.name)
+
+    def transform(uniques):
+        text = uniques.astype(str)
+        email = text.str.contains(EMAIL_PATTERN)
+        phone = ~email & text.str.match(PHONE_PATTERN)
+        general = text.str[:1] + '.'
+        general[email] = '*@' + text[email].str.split('@').str[-1]
+        general[phone] = text[phone].str.replace(r'\D', '', regex=True).str[:3] + '-***'
+        return general
+    return _on_uniques(series, transform)
+
+
+def anonymize_frame(df, plan, key, hash_length=12, width=10):
+    """Apply a ``{column: method}`` plan to one frame; runs in worker processes for file jobs."""
+    result = df.drop(columns=[col for col, method in plan.items() if method == DROP and col in df.columns])
+    for col, method in plan.items():
+        if col not in result.columns:
+            continue
+        if method == HASH:
+            result[col] = hash_values(result[col], key, hash_length)
+        elif method == MASK:
+            result[col] = mask_values(result[col])
+        elif method == GENERALIZE:
+            result[col] = generalize_values(result[col], width)
+        elif method != DROP:
+            raise ValueError(f"Unknown anonymisation method {method} for column {col}.")
+    return result
+
+
+def _parquet_schema(chunk):
+    """Parquet schema for a streamed file, from the dtypes of its first chunk.
+
+    Columns without a single value in that chunk have no type to go by (all-NaN floats, nulls) and
+    are written as text, so values appearing in later chunks always fit.
+    """
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    empty = set(chunk.columns[chunk.isna().all().to_numpy()])
+    return pa.schema([field.with_type(pa.string()) if field.name in empty else field for field in schema], metadata=schema.metadata)
+
+
+def _anonymize_chunk(args):
+    return anonymize_frame(*args)
+
+
+@traced
+class Anonymizer:
+    """Keyed hashing, masking, generalisation or dropping of PII columns.
+
+    In-memory frames are transformed directly. Files are streamed in ``chunk_rows`` chunks through a
+    process pool with a bounded number of chunks in flight, and written in their original order, so
+    memory stays proportional to ``workers * chunk_rows`` whatever the file size.
+    """
+
+    def __init__(self, key=None, hash_length=12, generalize_width=10, chunk_rows=100000, workers=None):
+        self.key = key or _default_key()
+        self.hash_length = hash_length
+        self.generalize_width = generalize_width
+        self.chunk_rows = chunk_rows
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+
+    def default_plan(self, pii_columns):
+        """Mask contact details and pseudonymise everything else, so records stay linkable but unreadable."""
+        plan = {}
+        for col in pii_columns:
+            plan[col] = MASK if 'email' in col.lower() or 'phone' in col.lower() else HASH
+        return plan
+
+    def transform(self, df, plan):
+        try:
+            return anonymize_frame(df, plan, self.key, self.hash_length, self.generalize_width)
+        except Exception as e:
+            st.error(f"Error anonymizing data: {str(e)}", icon="❌")
+            return None
+
+    def pseudonyms(self, series):
+        """Keyed pseudonyms for one column, e.g. to list candidates in a report without their names."""
+        return hash_values(series, self.key, self.hash_length)
+
+    def anonymize_file(self, src_path, dst_path, plan=None, progress_callback=None):
+        """Stream ``src_path`` (CSV) to ``dst_path`` (.csv or .parquet); with no plan, PII is detected on the first chunk."""
+        reader = pd.read_csv(src_path, chunksize=self.chunk_rows)
+        parquet = dst_path.lower().endswith('.parquet')
+        writer = None
+        rows_done = 0
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                for chunk in reader:
+                    if plan is None:
+                        plan = self.default_plan(PrivacyChecker().detect_pii(chunk))
+                    pending.append(pool.submit(_anonymize_chunk, (chunk, plan, self.key, self.hash_length, self.generalize_width)))
+                    # Keep at most two chunks per worker in flight so memory stays bounded
+                    while len(pending) >= 2 * self.workers:
+                        writer, rows_done = self._write(pending.popleft().result(), dst_path, parquet, writer, rows_done, progress_callback)
+                while pending:
+                    writer, rows_done = self._write(pending.popleft().result(), dst_path, parquet, writer, rows_done, progress_callback)
+            finally:
+                for future in pending:
+                    future.cancel()
+                if parquet and writer is not None:
+                    writer.close()
+        return rows_done, plan or {}
+
+    def _write(self, chunk, dst_path, parquet, writer, rows_done, progress_callback):
+        if parquet:
+            if writer is None:
+                writer = pq.ParquetWriter(dst_path, _parquet_schema(chunk))
+            # Every chunk is cast to the file schema fixed by the first one
+            text = [field.name for field in writer.schema if pa.types.is_string(field.type)]
+            table = pa.Table.from_pandas(chunk.astype({col: 'string' for col in text}), schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+        else:
+            chunk.to_csv(dst_path, mode='w' if rows_done == 0 else 'a', header=rows_done == 0, index=False)
+        rows_done += len(chunk)
+        if progress_callback:
+            progress_callback(rows_done)
+        return writer, rows_done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Anonymise PII columns of a CSV export chunk by chunk.")
+    parser.add_argument('source', help="Input CSV file.")
+    parser.add_argument('destination', help="Output .csv or .parquet file.")
+    parser.add_argument('--column', action='append', default=[], metavar='NAME=METHOD', help=f"Column and method ({', '.join(METHODS)}); repeatable. Defaults to the detected PII columns.")
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=None, help="Size of the anonymisation process pool.")
+    parser.add_argument('--generalize-width', type=int, default=10, help="Band width for generalised numeric columns.")
+    args = parser.parse_args()
+    if not os.environ.get('BIAS_DASHBOARD_ANON_KEY'):
+        print("Warning: BIAS_DASHBOARD_ANON_KEY is not set; pseudonyms will differ between runs.")
+    column_plan = dict(item.split('=', 1) for item in args.column) or None
+    anonymizer = Anonymizer(generalize_width=args.generalize_width, chunk_rows=args.chunk_rows, workers=args.workers)
+    rows, applied = anonymizer.anonymize_file(args.source, args.destination, column_plan, lambda rows_done: print(f"{rows_done} rows written", end='\r'))
+    print(f"\n{rows} rows anonymised: {', '.join(f'{col}={method}' for col, method in applied.items()) or 'no PII columns found'}")
\ No newline at end of file
@@ -0,0 +1,322 @@
+"""Local HTTP audit service running the dashboard's fairness, PII and readiness checks.
+
+Run with ``python audit_service.py --port 8765 --workers 4 --max-pending 32 [--data-dir DIR]``.
+
+Endpoints:
+    POST /audits            CSV/Excel body (``?format=csv|xlsx&target=...&sensitive=a,b``) or a
+                            JSON body ``{"path": ..., "target": ..., "sensitive_cols": [...]}``,
+                            where ``path`` is relative to ``--data-dir`` (JSON requests are
+                            refused without one). Returns 202 with a job id, or 429 when the
+                            queue is full.
+    GET  /audits/<job_id>   Job status and, once finished, the audit result. ``?wait=<seconds>``
+                            blocks until the job finishes or the wait expires.
+    GET  /health            Queue depth, worker count and recent throughput.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from bias_analyzer import BiasAnalyzer
+from data_processor import DataProcessor
+from ml_predictor import MLPredictor
+from privacy_checker import PrivacyChecker
+
+
+def run_audit(request):
+    """Run the full audit for one job. Executed inside a worker process."""
+    processor = DataProcessor()
+    if request.get('data') is not None:
+        source = io.BytesIO(request['data'])
+        source.name = f"upload.{request.get('format', 'csv')}"
+        df = processor.read_data(source)
+    else:
+        with open(request['path'], 'rb') as source:
+            df = processor.read_data(source)
+
+    cleaned_df = df.copy()
+    cleaning_issues = processor.clean_data(cleaned_df)
+    sensitive_cols = request.get('sensitive_cols') or processor.detect_sensitive_columns(cleaned_df)
+    missing = [col for col in sensitive_cols if col not in cleaned_df.columns]
+    if missing:
+        raise ValueError(f"Sensitive columns not found in dataset: {', '.join(missing)}")
+
+    # Worker processes have no page to show errors on; failures go to the job's error field
+    analyzer = BiasAnalyzer(report_errors=False)
+    target_col = request.get('target')
+    if target_col is None:
+        binary_cols = [col for col in cleaned_df.columns if analyzer.is_binary(cleaned_df[col])]
+        target_col = binary_cols[0] if binary_cols else None
+    fairness = {}
+    if target_col is not None:
+        for col in sensitive_cols:
+            fairness[col] = analyzer.calculate_fairness_metrics(cleaned_df, col, target_col)
+
+    checker = PrivacyChecker()
+    pii_columns = checker.detect_pii(cleaned_df)
+    readiness, message, score = MLPredictor().check_ml_readiness(cleaned_df, sensitive_cols)
+
+    return _jsonable({
+        'rows': len(cleaned_df),
+        'columns': cleaned_df.shape[1],
+        'cleaning': cleaning_issues,
+        'sensitive_cols': sensitive_cols,
+        'target': target_col,
+        'fairness': fairness,
+        'pii': {
+            'columns': pii_columns,
+            'recommendations': checker.get_pii_recommendations(pii_columns)
+        },
+        'ml_readiness': {'ready': readiness, 'score': score, 'message': message}
+    })
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class _Job:
+    def __init__(self, job_id, future):
+        self.id = job_id
+        self.future = future
+        self.submitted = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        status = 'queued'
+        if self.future.running():
+            status = 'running'
+        elif self.future.cancelled():
+            status = 'cancelled'
+        elif self.future.done():
+            status = 'failed' if self.future.exception() is not None else 'done'
+        body = {'job_id': self.id, 'status': status, 'submitted': self.submitted, 'finished': self.finished}
+        if status == 'done':
+            body['result'] = self.future.result()
+        elif status == 'failed':
+            body['error'] = str(self.future.exception())
+        return body
+
+
+class AuditService:
+    """Bounded job queue in front of a process pool.
+
+    At most ``max_pending`` jobs may be queued or running; further submissions are rejected so
+    bursts from CI pipelines get a 429 with ``Retry-After`` instead of piling up on the host.
+    """
+
+    def __init__(self, workers=2, max_pending=16, max_jobs=1000):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = OrderedDict()
+        self._completed = deque(maxlen=10000)
+        self._lock = threading.Lock()
+
+    def submit(self, request):
+        """Queue an audit and return its job id, or None when the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        job_id = uuid.uuid4().hex
+        try:
+            future = self.pool.submit(run_audit, request)
+        except Exception:
+            self._slots.release()
+            raise
+        job = _Job(job_id, future)
+        with self._lock:
+            self._jobs[job_id] = job
+            # Forget the oldest finished jobs once the registry is full.
+            while len(self._jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.future.done():
+                    break
+                del self._jobs[oldest_id]
+        future.add_done_callback(lambda _: self._finish(job))
+        return job_id
+
+    def get(self, job_id, wait=0):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if wait > 0:
+            try:
+                job.future.exception(timeout=wait)
+            except (FutureTimeoutError, CancelledError):
+                pass
+        return job.to_dict()
+
+    def health(self):
+        now = time.time()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job.future.done())
+            last_minute = sum(1 for finished in self._completed if finished >= now - 60)
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'pending': pending,
+            'max_pending': self.max_pending,
+            'audits_last_minute': last_minute
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job):
+        job.finished = time.time()
+        with self._lock:
+            self._completed.append(job.finished)
+        self._slots.release()
+
+
+class AuditRequestHandler(BaseHTTPRequestHandler):
+    service = None
+    data_dir = None
+    max_upload_bytes = 200 * 1024 * 1024
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ['health']:
+            self._send(200, self.service.health())
+        elif len(parts) == 2 and parts[0] == 'audits':
+            params = parse_qs(url.query)
+            try:
+                wait = float(params.get('wait', ['0'])[0])
+            except ValueError:
+                wait = math.nan
+            if not math.isfinite(wait):
+                self._send(400, {'error': "'wait' must be a finite number of seconds"})
+                return
+            wait = min(max(wait, 0.0), 60.0)
+            job = self.service.get(parts[1], wait=wait)
+            if job is None:
+                self._send(404, {'error': f"Unknown job {parts[1]}"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/audits':
+            self._send(404, {'error': 'Not found'})
+            return
+        if self.headers.get('Content-Length') is None:
+            self._send(411, {'error': "A Content-Length header is required"})
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self._send(400, {'error': "'Content-Length' must be a non-negative integer"})
+            return
+        if length > self.max_upload_bytes:
+            self._send(413, {'error': f"Upload exceeds {self.max_upload_bytes // (1024 * 1024)} MB"})
+            return
+        body = self.rfile.read(length)
+        try:
+            request = self._parse_request(url, body)
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+        job_id = self.service.submit(request)
+        if job_id is None:
+            self._send(429, {'error': 'Audit queue is full, retry later'}, headers={'Retry-After': '5'})
+        else:
+            self._send(202, {'job_id': job_id, 'status_url': f"/audits/{job_id}"})
+
+    def _parse_request(self, url, body):
+        params = parse_qs(url.query)
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('application/json'):
+            try:
+                payload = json.loads(body or b'{}')
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON body: {e}")
+            if not payload.get('path'):
+                raise ValueError("JSON requests must include a dataset 'path'.")
+            return {
+                'path': self._data_path(payload['path']),
+                'target': payload.get('target'),
+                'sensitive_cols': payload.get('sensitive_cols')
+            }
+        if not body:
+            raise ValueError("Request body is empty. Upload a CSV or Excel file.")
+        file_format = params.get('format', ['csv'])[0]
+        if file_format not in ('csv', 'xlsx'):
+            raise ValueError("Unsupported file format. Use CSV or Excel.")
+        sensitive = params.get('sensitive', [''])[0]
+        return {
+            'data': body,
+            'format': file_format,
+            'target': params.get('target', [None])[0],
+            'sensitive_cols': [col for col in sensitive.split(',') if col] or None
+        }
+
+    def _data_path(self, path):
+        """Resolve a JSON request's ``path`` inside ``data_dir``; anything outside it is refused."""
+        if self.data_dir is None:
+            raise ValueError("Dataset paths are disabled. Start the service with --data-dir or upload the file.")
+        root = os.path.realpath(self.data_dir)
+        resolved = os.path.realpath(os.path.join(root, str(path)))
+        if os.path.commonpath([root, resolved]) != root or not os.path.isfile(resolved):
+            raise ValueError(f"Dataset '{path}' not found in the data directory.")
+        return resolved
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(host='127.0.0.1', port=8765, workers=2, max_pending=16, data_dir=None):
+    service = AuditService(workers=workers, max_pending=max_pending)
+    handler = type('Handler', (AuditRequestHandler,), {'service': service, 'data_dir': data_dir})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Audit service listening on http://{host}:{port} ({workers} workers, {max_pending} pending max)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bias audit HTTP service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2, help="Size of the audit process pool.")
+    parser.add_argument('--max-pending', type=int, default=16, help="Queued plus running jobs before new submissions get 429.")
+    parser.add_argument('--data-dir', default=os.environ.get('BIAS_AUDIT_DATA_DIR'), help="Directory JSON requests may read datasets from; JSON requests are refused without it.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.max_pending, args.data_dir)
\ No newline at end of file
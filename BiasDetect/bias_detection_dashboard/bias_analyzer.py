@@ -1,9 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from fairlearn.metrics import MetricFrame, demographic_parity_ratio, equalized_odds_ratio
 import pandas as pd
 import numpy as np
 import streamlit as st
+from schema import get_schema
+from tracer import traced
 
+@traced
 class BiasAnalyzer:
+    def __init__(self, report_errors=True):
+        # Background callers without a page to report to pass False and handle raised errors themselves
+        self.report_errors = report_errors
+
     def is_binary(self, series):
         unique_values = series.dropna().unique()
         return len(unique_values) == 2 and set(unique_values).issubset({0, 1})
@@ -18,6 +26,128 @@ class BiasAnalyzer:
                 raise ValueError(f"Column {series.name} has insufficient variation for binning.")
         return series
 
+    def binning_sweep(self, df, sensitive_col, target_col, bin_counts=range(2, 21), strategies=('equal_width', 'quantile'), custom_edges=None):
+        """Disparate impact of a continuous sensitive column under many binning schemes.
+
+        The column is sorted once and the target prefix-summed, so each scheme only needs a
+        searchsorted of its edges instead of a fresh pd.cut and groupby.
+        """
+        try:
+            if not pd.api.types.is_numeric_dtype(df[sensitive_col]):
+                raise ValueError(f"Column {sensitive_col} is not continuous; binning does not apply.")
+            if not self.is_binary(df[target_col]):
+                raise ValueError(f"Target column {target_col} must be binary (0 or 1) for fairness metrics.")
+            data = df[[sensitive_col, target_col]].dropna()
+            values = data[sensitive_col].to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')
+            values = values[order]
+            if values[0] == values[-1]:
+                raise ValueError(f"Column {sensitive_col} has insufficient variation for binning.")
+            positives = np.concatenate([[0.0], np.cumsum(data[target_col].to_numpy(dtype=float)[order])])
+
+            schemes = []
+            for strategy in strategies:
+                for bins in bin_counts:
+                    if strategy == 'equal_width':
+                        edges = np.linspace(values[0], values[-1], bins + 1)
+                    elif strategy == 'quantile':
+                        # Linear-interpolated quantiles read straight off the sorted values
+                        ranks = np.linspace(0, len(values) - 1, bins + 1)
+                        lower = np.floor(ranks).astype(int)
+                        upper = np.ceil(ranks).astype(int)
+                        edges = np.unique(values[lower] + (values[upper] - values[lower]) * (ranks - lower))
+                    else:
+                        raise ValueError(f"Unknown binning strategy {strategy}.")
+                    schemes.append((strategy, bins, edges))
+            for edges in custom_edges or []:
+                edges = np.unique(np.asarray(edges, dtype=float))
+                schemes.append(('custom', len(edges) - 1, edges))
+
+            rows = []
+            for strategy, bins, edges in schemes:
+                # Right-closed bins as in pd.cut; the first bin also includes its lower edge
+                bounds = np.searchsorted(values, edges, side='right')
+                bounds[0] = np.searchsorted(values, edges[0], side='left')
+                counts = np.diff(bounds)
+                selected = np.diff(positives[bounds])
+                occupied = counts > 0
+                rates = selected[occupied] / counts[occupied]
+                rows.append({
+                    'Strategy': strategy,
+                    'Bins': bins,
+                    'Groups': int(occupied.sum()),
+                    'Smallest Group': int(counts[occupied].min()) if occupied.any() else 0,
+                    'Min Selection Rate': rates.min() if len(rates) else np.nan,
+                    'Max Selection Rate': rates.max() if len(rates) else np.nan,
+                    'Disparate Impact': rates.min() / rates.max() if len(rates) > 1 and rates.max() > 0 else np.nan,
+                    'Edges': np.round(edges, 2).tolist()
+                })
+            return pd.DataFrame(rows)
+        except Exception as e:
+            st.error(f"Error running binning sweep for {sensitive_col}: {str(e)}", icon="❌")
+            return pd.DataFrame()
+
+    def threshold_sweep(self, scores, y_true, sensitive, max_thresholds=2000):
+        """Fairness and accuracy of the decision ``score >= t`` at every distinct threshold t.
+
+        Scores are sorted once per group; cumulative positive counts then give selected, true
+        positive and false positive counts for all thresholds with one searchsorted per group.
+        Above ``max_thresholds`` distinct scores, thresholds are taken at evenly spaced quantiles.
+        """
+        try:
+            scores = pd.Series(scores).reset_index(drop=True)
+            y_true = pd.Series(y_true).reset_index(drop=True)
+            sensitive = self.bin_continuous_column(pd.Series(sensitive).reset_index(drop=True))
+            mask = scores.notna() & y_true.notna() & sensitive.notna()
+            if not self.is_binary(y_true[mask]):
+                raise ValueError("Outcome must be binary (0 or 1) for a threshold sweep.")
+            scores = scores[mask].to_numpy(dtype=float)
+            y_true = y_true[mask].to_numpy(dtype=float)
+            codes, groups = pd.factorize(sensitive[mask], sort=True)
+            if len(groups) < 2:
+                raise ValueError("Sensitive attribute needs at least 2 groups for a threshold sweep.")
+
+            thresholds = np.unique(scores)
+            if max_thresholds and len(thresholds) > max_thresholds:
+                thresholds = np.unique(np.quantile(scores, np.linspace(0, 1, max_thresholds)))
+
+            n_groups, n_thresholds = len(groups), len(thresholds)
+            selected = np.empty((n_groups, n_thresholds))
+            true_pos = np.empty((n_groups, n_thresholds))
+            sizes = np.bincount(codes, minlength=n_groups).astype(float)
+            positives = np.bincount(codes, weights=y_true, minlength=n_groups)
+            for g in range(n_groups):
+                in_group = codes == g
+                order = np.argsort(scores[in_group], kind='stable')
+                group_scores = scores[in_group][order]
+                cum_pos = np.concatenate([[0.0], np.cumsum(y_true[in_group][order])])
+                below = np.searchsorted(group_scores, thresholds, side='left')
+                selected[g] = sizes[g] - below
+                true_pos[g] = positives[g] - cum_pos[below]
+            false_pos = selected - true_pos
+            negatives = sizes - positives
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                selection_rate = selected / sizes[:, None]
+                tpr = true_pos / positives[:, None]
+                fpr = false_pos / negatives[:, None]
+                disparate_impact = selection_rate.min(axis=0) / selection_rate.max(axis=0)
+                tpr_ratio = np.nanmin(tpr, axis=0) / np.nanmax(tpr, axis=0)
+                fpr_ratio = np.nanmin(fpr, axis=0) / np.nanmax(fpr, axis=0)
+            sweep = pd.DataFrame({
+                'Threshold': thresholds,
+                'Selection Rate': selected.sum(axis=0) / sizes.sum(),
+                'Accuracy': (true_pos.sum(axis=0) + negatives.sum() - false_pos.sum(axis=0)) / sizes.sum(),
+                'Disparate Impact': disparate_impact,
+                'Equalized Odds': np.fmin(tpr_ratio, fpr_ratio)
+            })
+            for g, group in enumerate(groups):
+                sweep[f"Selection Rate ({group})"] = selection_rate[g]
+            return sweep
+        except Exception as e:
+            st.error(f"Error running threshold sweep: {str(e)}", icon="❌")
+            return pd.DataFrame()
+
     def calculate_fairness_metrics(self, df, sensitive_col, target_col):
         try:
             if sensitive_col not in df.columns or target_col not in df.columns:
@@ -65,17 +195,69 @@ class BiasAnalyzer:
             }
             return metrics
         except Exception as e:
+            if not self.report_errors:
+                raise
             st.error(f"Error calculating fairness metrics for {sensitive_col}: {str(e)}", icon="❌")
             return {}
 
+    def fairness_matrix(self, df, target_cols, sensitive_cols, max_workers=4):
+        """Fairness metrics for every (binary target, sensitive column) pair as one tidy table.
+
+        Each sensitive column is binned and encoded once and all targets are stacked into one
+        matrix, so a column's selection rates for every target come from a single grouped sum.
+        Columns are processed concurrently. Metrics follow ``calculate_fairness_metrics``: the
+        outcome is its own prediction, so Equalized Odds is 1 unless a group has no positives.
+        """
+        try:
+            targets = [col for col in target_cols if self.is_binary(df[col])]
+            if not targets:
+                raise ValueError("No binary (0 or 1) target columns to analyze.")
+            outcomes = df[targets].to_numpy(dtype=float, na_value=np.nan)
+
+            def analyze(sensitive_col):
+                codes, groups = pd.factorize(self.bin_continuous_column(df[sensitive_col]), sort=True)
+                rows = []
+                for t, target in enumerate(targets):
+                    valid = (codes >= 0) & ~np.isnan(outcomes[:, t])
+                    sizes = np.bincount(codes[valid], minlength=len(groups)).astype(float)
+                    positives = np.bincount(codes[valid], weights=outcomes[valid, t], minlength=len(groups))
+                    present = sizes > 0
+                    rates = positives[present] / sizes[present]
+                    enough = len(rates) >= 2 and len(np.unique(outcomes[valid, t])) == 2
+                    rows.append({
+                        'Target': target,
+                        'Sensitive Column': sensitive_col,
+                        'Groups': int(present.sum()),
+                        'Rows': int(valid.sum()),
+                        'Min Selection Rate': rates.min() if len(rates) else np.nan,
+                        'Max Selection Rate': rates.max() if len(rates) else np.nan,
+                        'Disparate Impact': rates.min() / rates.max() if enough and rates.max() > 0 else np.nan,
+                        'Demographic Parity Difference': rates.max() - rates.min() if enough else np.nan,
+                        'Equalized Odds': float((positives[present] > 0).all()) if enough else np.nan,
+                        'Selection Rate by Group': dict(zip(np.asarray(groups)[present].tolist(), rates.round(4).tolist()))
+                    })
+                return rows
+
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(analyze, sensitive_cols))
+            matrix = pd.DataFrame([row for rows in results for row in rows])
+            matrix['Below Threshold'] = matrix['Disparate Impact'] < 0.8
+            return matrix
+        except Exception as e:
+            if not self.report_errors:
+                raise
+            st.error(f"Error computing fairness matrix: {str(e)}", icon="❌")
+            return pd.DataFrame()
+
     def get_recommendations(self, df, sensitive_cols):
         recommendations = []
+        text_cols = get_schema(df).text_columns()
         for col in sensitive_cols:
             if df[col].nunique() < 2:
                 recommendations.append(f"Column {col} has insufficient variation. Collect more diverse data.")
             if df[col].isna().sum() / len(df) > 0.1:
                 recommendations.append(f"Column {col} has >10% missing values. Consider imputing or removing.")
-            if df[col].dtype == 'object' and df[col].str.contains(r'@\S+\.\S+', na=False).any():
+            if col in text_cols and df[col].str.contains(r'@\S+\.\S+', na=False).any():
                 recommendations.append(f"Column {col} may contain emails. Remove for privacy.")
         return recommendations
 
@@ -86,7 +268,7 @@ class BiasAnalyzer:
                 if col in cleaned_df.columns:
                     group_counts = cleaned_df[col].value_counts()
                     weights = 1 / group_counts
-                    cleaned_df['weight'] = cleaned_df[col].map(weights)
+                    cleaned_df['weight'] = cleaned_df[col].map(weights).astype(float)
                     cleaned_df['weight'] = cleaned_df['weight'] / cleaned_df['weight'].sum()
             return cleaned_df
         except Exception as e:
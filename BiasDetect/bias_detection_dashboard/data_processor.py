@@ -1,39 +1,72 @@
 import pandas as pd
 import streamlit as st
+from dedup import NearDuplicateDetector
+from excel_loader import ExcelLoader
+from imputer import GLOBAL, METHODS, Imputer
+from schema import get_schema, invalidate
+from tracer import traced
 
+@traced
 class DataProcessor:
-    def load_data(self, file):
+    def read_data(self, file, sheets=None, columns=None, progress_callback=None):
+        """Parse a CSV or Excel file into a compact frame; parse errors are raised to the caller."""
+        if file.name.endswith('.csv'):
+            df = pd.read_csv(file)
+        elif file.name.endswith('.xlsx'):
+            df = ExcelLoader().load(file, sheets=sheets, columns=columns, progress_callback=progress_callback)
+        else:
+            raise ValueError("Unsupported file format. Use CSV or Excel.")
+        return get_schema(df).compact(df)
+
+    def load_data(self, file, sheets=None, columns=None, progress_callback=None):
         try:
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.name.endswith('.xlsx'):
-                df = pd.read_excel(file)
-            else:
-                raise ValueError("Unsupported file format. Use CSV or Excel.")
-            return df
+            return self.read_data(file, sheets=sheets, columns=columns, progress_callback=progress_callback)
         except Exception as e:
             st.error(f"Error loading file: {e}", icon="❌")
             return None
 
-    def clean_data(self, df):
+    def clean_data(self, df, imputation=GLOBAL):
         issues = []
         original_df = df.copy()
         
-        # Handle missing values
+        # Handle missing values; group-aware methods keep per-group differences intact
         if df.isna().sum().sum() > 0:
-            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-            df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
-            categorical_cols = df.select_dtypes(include=['object']).columns
-            df[categorical_cols] = df[categorical_cols].fillna(df[categorical_cols].mode().iloc[0])
-            issues.append("Missing values filled (numerical: mean, categorical: mode)")
+            Imputer(imputation).fill(df, self.detect_sensitive_columns(df))
+            if imputation == GLOBAL:
+                issues.append("Missing values filled (numerical: mean, categorical: mode)")
+            else:
+                issues.append(f"Missing values filled ({METHODS[imputation].lower()})")
 
         # Remove duplicates
         if df.duplicated().sum() > 0:
             df.drop_duplicates(inplace=True)
             issues.append(f"Removed {original_df.duplicated().sum()} duplicate rows")
 
+        if issues:
+            # Fills and dropped rows leave dtypes unchanged, so value-based inferences must be redone
+            invalidate(df)
         return issues
 
+    def find_near_duplicates(self, df, threshold=0.8, linked_threshold=0.4):
+        """Rows that are probably the same applicant under different name, email or phone spellings.
+
+        Returns the per-row frame, the cluster report and the number of over-full LSH buckets skipped.
+        """
+        try:
+            detector = NearDuplicateDetector(threshold=threshold, linked_threshold=linked_threshold)
+            columns = detector.identity_columns(df)
+            if not any(columns.values()):
+                raise ValueError("No name, email or phone column found to compare applicants.")
+            rows, report = detector.find(df, columns)
+            return rows, report, detector.skipped_buckets
+        except Exception as e:
+            st.error(f"Error detecting near-duplicates: {e}", icon="❌")
+            return None, None, 0
+
+    def merge_near_duplicates(self, df, rows):
+        """Keep the first row of each near-duplicate cluster."""
+        return df.loc[~rows['Duplicate'].reindex(df.index, fill_value=False)]
+
     def detect_sensitive_columns(self, df):
         sensitive_keywords = ['gender', 'age', 'race', 'ethnicity', 'religion', 'disability']
         sensitive_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in sensitive_keywords)]
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+_fingerprints = {}
+
+_STRING_TYPES = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+
+
+def _signature(df):
+    return df.shape, tuple(map(str, df.columns)), tuple(map(str, df.dtypes))
+
+
+def fingerprint(df):
+    """Content hash of a DataFrame, cached per frame object.
+
+    Fingerprinted frames are treated as read-only: the cache only notices changes to the shape,
+    columns or dtypes, so code that edits values must work on a copy.
+    """
+    cached = _fingerprints.get(id(df))
+    if cached is not None and cached[0]() is df and cached[1] == _signature(df):
+        return cached[2]
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    value = digest.hexdigest()
+    key = id(df)
+
+    def forget(ref):
+        if _fingerprints.get(key, (None,))[0] is ref:
+            del _fingerprints[key]
+    _fingerprints[key] = (weakref.ref(df, forget), _signature(df), value)
+    return value
+
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'background'
+
+
+class _Entry:
+    def __init__(self, key, frame, path, nbytes):
+        self.key = key
+        self.frame = frame
+        self.path = path
+        self.nbytes = nbytes
+        self.sessions = set()
+        self.last_access = time.time()
+
+
+class DatasetStore:
+    """Process-wide, content-addressed store of read-only datasets shared by all browser sessions.
+
+    Each dataset is written once as an Arrow IPC file and read back memory-mapped, so numeric
+    columns are backed by the page cache rather than private memory. A session holds one dataset
+    per role: the upload (``st.session_state.df``) and its cleaned version (``cleaned_df``);
+    only frames it modifies further (e.g. after mitigation) are its own. Shared frames must not be
+    modified in place. Entries no session references are evicted least-recently-used first once
+    the store exceeds ``max_bytes``.
+    """
+
+    def __init__(self, store_dir=None, max_bytes=None):
+        self.store_dir = store_dir or os.environ.get('BIAS_DASHBOARD_STORE_DIR', os.path.join(tempfile.gettempdir(), 'bias_dashboard_store'))
+        self.max_bytes = max_bytes or int(os.environ.get('BIAS_DASHBOARD_STORE_MAX_MB', '2048')) * 1024 * 1024
+        self._entries = OrderedDict()
+        self._held = {}
+        self._lock = threading.RLock()
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def load(self, uploaded_file, loader, variant=''):
+        """Return the shared frame for ``uploaded_file``, parsing it with ``loader`` only on first sight.
+
+        ``variant`` distinguishes different parses of the same bytes (e.g. selected sheets or columns).
+        """
+        digest = hashlib.sha256(uploaded_file.getvalue())
+        digest.update(variant.encode())
+        key = digest.hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._acquire(entry, _session_id(), 'upload')
+                return entry.frame
+        df = loader(uploaded_file)
+        if df is None:
+            return None
+        return self.put(key, df)
+
+    def put(self, key, df, role='upload'):
+        """Register ``df`` under ``key`` as the current session's ``role`` dataset and return the shared read-only frame."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._materialize(key, df)
+                self._entries[key] = entry
+            self._acquire(entry, _session_id(), role)
+            self._evict()
+            return entry.frame
+
+    def release(self, session_id=None):
+        session_id = session_id or _session_id()
+        with self._lock:
+            for entry in self._entries.values():
+                entry.sessions.discard(session_id)
+            for held in [held for held in self._held if held[0] == session_id]:
+                del self._held[held]
+            self._evict()
+
+    def release_idle(self, max_idle_seconds):
+        """Drop references from sessions that have not touched their dataset for ``max_idle_seconds``."""
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.last_access < cutoff:
+                    entry.sessions.clear()
+            self._held = {held: key for held, key in self._held.items() if held[0] in self._entries[key].sessions}
+            self._evict()
+
+    def owns(self, df):
+        with self._lock:
+            return any(entry.frame is df for entry in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return pd.DataFrame([{
+                'key': entry.key[:12],
+                'rows': len(entry.frame),
+                'size_mb': entry.nbytes / 1e6,
+                'memory_mapped': entry.path is not None,
+                'sessions': len(entry.sessions),
+                'last_access': pd.Timestamp(entry.last_access, unit='s')
+            } for entry in self._entries.values()])
+
+    def _acquire(self, entry, session_id, role):
+        # A session holds one dataset per role; a new upload or cleaning releases the previous one.
+        previous = self._held.get((session_id, role))
+        self._held[(session_id, role)] = entry.key
+        still_held = any(key == previous for (held_session, _), key in self._held.items() if held_session == session_id)
+        if previous in self._entries and not still_held:
+            self._entries[previous].sessions.discard(session_id)
+        entry.sessions.add(session_id)
+        entry.last_access = time.time()
+        self._entries.move_to_end(entry.key)
+
+    def _materialize(self, key, df):
+        path = os.path.join(self.store_dir, f"{key}.arrow")
+        try:
+            if not os.path.exists(path):
+                table = pa.Table.from_pandas(df, preserve_index=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with pa.OSFile(tmp_path, 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                os.replace(tmp_path, path)
+            table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            # split_blocks keeps one block per column so null-free numeric columns stay zero-copy views of the map;
+            # strings stay Arrow-backed (and mapped) instead of being copied into Python objects.
+            frame = table.to_pandas(split_blocks=True, types_mapper=_STRING_TYPES.get)
+            return _Entry(key, frame, path, int(table.nbytes))
+        except (pa.ArrowException, OSError):
+            # Columns Arrow cannot represent (e.g. mixed object types) are shared in memory instead.
+            return _Entry(key, df, None, int(df.memory_usage(index=True, deep=True).sum()))
+
+    def _evict(self):
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.sessions:
+                continue
+            del self._entries[key]
+            self._held = {held: held_key for held, held_key in self._held.items() if held_key != key}
+            total -= entry.nbytes
+            if entry.path is not None:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+dataset_store = DatasetStore()
\ No newline at end of file
@@ -0,0 +1,237 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from tracer import traced
+
+_NAME_WIDTH = 32
+_EMAIL_WIDTH = 24
+
+# Filler values shared by unrelated applicants; they must not link rows
+_PLACEHOLDER_EMAILS = {'none', 'na', 'null', 'noemail', 'nomail', 'noreply', 'unknown', 'test'}
+_PLACEHOLDER_PHONES = {'1234567890', '0123456789'}
+
+
+def _on_uniques(series, transform):
+    codes, uniques = pd.factorize(series)
+    values = np.asarray(transform(pd.Series(uniques, dtype=object)), dtype=object) if len(uniques) else np.array([], dtype=object)
+    result = np.where(codes >= 0, values.take(np.maximum(codes, 0)) if len(values) else '', '')
+    return pd.Series(result, index=series.index)
+
+
+def normalize_name(series):
+    """Lower-case ASCII letters only, with the words sorted so "Brooks, Aiden" matches "aiden brooks"."""
+    def transform(uniques):
+        text = uniques.astype(str).str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        words = text.str.lower().str.replace(r'[^a-z ]', ' ', regex=True).str.split()
+        return words.map(lambda parts: ' '.join(sorted(parts)))
+    return _on_uniques(series, transform)
+
+
+def normalize_email(series):
+    """Lower-cased address without dots or ``+tag`` in the local part."""
+    def transform(uniques):
+        text = uniques.astype(str).str.strip().str.lower().str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        text = text.str.replace(r'\+[^@]*(?=@)', '', regex=True).str.replace(r'\.(?=[^@]*@)', '', regex=True)
+        placeholder = text.str.split('@').str[0].str.replace('-', '', regex=False).isin(_PLACEHOLDER_EMAILS)
+        return text.where(text.str.contains('@', regex=False) & ~placeholder, '')
+    return _on_uniques(series, transform)
+
+
+def normalize_phone(series):
+    """Digits only, keeping the last ten so country prefixes and formatting do not matter; filler numbers become empty."""
+    def transform(uniques):
+        digits = uniques.astype(str).str.replace(r'\D', '', regex=True).str[-10:]
+        return digits.where(~(digits.str.fullmatch(r'(\d)\1*') | digits.isin(_PLACEHOLDER_PHONES)), '')
+    return _on_uniques(series, transform)
+
+
+def _grams(values, width, field, stop=None):
+    """Character 3-gram ids of fixed-width byte strings; id 0 marks grams that run past the end of the string (or ``stop``)."""
+    chars = np.array(values, dtype=f'S{width}').view(np.uint8).reshape(len(values), width).astype(np.uint32)
+    if stop is not None:
+        chars[np.cumsum(chars == ord(stop), axis=1) > 0] = 0
+    grams = (chars[:, :-2] << 16) | (chars[:, 1:-1] << 8) | chars[:, 2:]
+    grams[chars[:, 2:] == 0] = 0
+    return np.where(grams > 0, grams | (field << 24), 0)
+
+
+def _token(values, field):
+    """One whole-value token per row (exact email or phone), 0 for empty values."""
+    hashed = pd.util.hash_array(np.asarray(values, dtype=object)).astype(np.uint32) | np.uint32(1)
+    return np.where(np.asarray(values, dtype=object) != '', (hashed & 0x00FFFFFF) | (field << 24), 0)[:, None]
+
+
+def _pairs_from_keys(keys, max_bucket, split=False):
+    """All pairs of row positions sharing a key, skipping empty keys.
+
+    Buckets larger than ``max_bucket`` are skipped and counted, or with ``split`` cut into runs of
+    ``max_bucket`` rows compared pairwise, with the runs' first rows chained so the bucket can still
+    form one cluster.
+    """
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    pairs = []
+    for size in np.unique(sizes[(sizes > 1) & (sizes <= max_bucket)]):
+        run_starts = starts[sizes == size]
+        left, right = np.triu_indices(size, 1)
+        pairs.append(np.stack([order[run_starts[:, None] + left].ravel(), order[run_starts[:, None] + right].ravel()], axis=1))
+    large = sizes > max_bucket
+    if not split:
+        return (np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)), int(large.sum())
+    for start, size in zip(starts[large], sizes[large]):
+        members = order[start:start + size]
+        for run in range(0, size, max_bucket):
+            block = members[run:run + max_bucket]
+            left, right = np.triu_indices(len(block), 1)
+            pairs.append(np.stack([block[left], block[right]], axis=1))
+        heads = members[::max_bucket]
+        pairs.append(np.stack([heads[:-1], heads[1:]], axis=1))
+    skipped = 0
+    return (np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)), skipped
+
+
+@traced
+class NearDuplicateDetector:
+    """Finds applicants that appear several times under slightly different names, emails or phone formats.
+
+    Each row becomes a set of tokens: character 3-grams of the normalised name and email local part,
+    plus whole-value email and phone tokens. A MinHash signature (16-bit values, built in row chunks)
+    is banded for LSH so only rows sharing a band are compared; rows sharing a normalised email or
+    phone are compared too. Pairs whose estimated Jaccard similarity reaches ``threshold`` (or
+    ``linked_threshold`` when email or phone match exactly) are merged into clusters. Band buckets
+    with more than ``max_bucket`` rows are skipped and counted in ``skipped_buckets``; large email
+    and phone buckets are compared in runs instead, and placeholder emails and phones are ignored.
+    """
+
+    def __init__(self, threshold=0.8, linked_threshold=0.4, num_perm=64, max_bucket=50, chunk_rows=100000, seed=42):
+        self.threshold = threshold
+        self.linked_threshold = linked_threshold
+        self.num_perm = num_perm
+        self.max_bucket = max_bucket
+        self.chunk_rows = chunk_rows
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, the high 32 bits of a*x + b are the hash
+        self._a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+        self.bands, self.rows = self._banding()
+
+    def identity_columns(self, df):
+        """Name, email and phone columns picked by header."""
+        columns = {'name': None, 'email': None, 'phone': None}
+        for col in df.columns:
+            lower = str(col).lower()
+            for field in columns:
+                if columns[field] is None and field in lower:
+                    columns[field] = col
+        return columns
+
+    def find(self, df, columns=None):
+        """Return a per-row frame (``Cluster``, ``Duplicate``, ``Similarity``) and a per-cluster merge report."""
+        columns = columns or self.identity_columns(df)
+        n_rows = len(df)
+        empty = pd.Series('', index=df.index)
+        names = normalize_name(df[columns['name']]) if columns.get('name') else empty
+        emails = normalize_email(df[columns['email']]) if columns.get('email') else empty
+        phones = normalize_phone(df[columns['phone']]) if columns.get('phone') else empty
+
+        signatures = np.empty((n_rows, self.num_perm), dtype=np.uint16)
+        has_tokens = np.zeros(n_rows, dtype=bool)
+        for start in range(0, n_rows, self.chunk_rows):
+            stop = min(start + self.chunk_rows, n_rows)
+            tokens = np.hstack([
+                _grams(names.iloc[start:stop].to_numpy(), _NAME_WIDTH, 1),
+                _grams(emails.iloc[start:stop].to_numpy(), _EMAIL_WIDTH, 2, stop='@'),
+                _token(emails.iloc[start:stop].to_numpy(), 3),
+                _token(phones.iloc[start:stop].to_numpy(), 4)
+            ]).astype(np.uint64)
+            signatures[start:stop] = self._minhash(tokens)
+            has_tokens[start:stop] = (tokens > 0).any(axis=1)
+
+        candidates, skipped = [], 0
+        for band in range(self.bands):
+            band_values = signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+            keys = np.zeros(n_rows, dtype=np.uint64)
+            for column in band_values.T:
+                keys = keys * np.uint64(1000003) + column
+            pairs, band_skipped = _pairs_from_keys(keys, self.max_bucket)
+            candidates.append(pairs)
+            skipped += band_skipped
+        linked = []
+        for values in (emails, phones):
+            codes, _ = pd.factorize(values.where(values != ''))
+            codes = np.where(codes < 0, np.arange(n_rows) + n_rows, codes)
+            pairs, _ = _pairs_from_keys(codes, self.max_bucket, split=True)
+            linked.append(pairs)
+
+        # Pairs are encoded as low * n + high so de-duplication is a flat sort
+        candidate_keys = np.unique(np.concatenate([np.minimum(p[:, 0], p[:, 1]) * n_rows + np.maximum(p[:, 0], p[:, 1]) for p in candidates + linked]))
+        linked_keys = np.unique(np.concatenate([np.minimum(p[:, 0], p[:, 1]) * n_rows + np.maximum(p[:, 0], p[:, 1]) for p in linked]))
+        candidates = np.stack([candidate_keys // n_rows, candidate_keys % n_rows], axis=1) if n_rows else np.empty((0, 2), dtype=np.int64)
+        # Rows without any name, email or phone all share the same empty signature
+        keep = has_tokens[candidates[:, 0]] & has_tokens[candidates[:, 1]]
+        candidates, is_linked = candidates[keep], np.isin(candidate_keys[keep], linked_keys)
+
+        # b-bit MinHash: 16-bit values collide by chance with probability 1/65536
+        chance = 1 / 65536
+        similarity = np.empty(len(candidates))
+        for start in range(0, len(candidates), self.chunk_rows):
+            chunk = candidates[start:start + self.chunk_rows]
+            similarity[start:start + self.chunk_rows] = (signatures[chunk[:, 0]] == signatures[chunk[:, 1]]).mean(axis=1)
+        similarity = np.clip((similarity - chance) / (1 - chance), 0, 1)
+        accepted = (similarity >= self.threshold) | (is_linked & (similarity >= self.linked_threshold))
+        pairs, similarity = candidates[accepted], similarity[accepted]
+        self.candidate_pairs = len(candidates)
+        self.skipped_buckets = skipped
+
+        graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n_rows, n_rows))
+        _, labels = connected_components(graph, directed=False)
+        best = np.zeros(n_rows)
+        np.maximum.at(best, pairs[:, 0], similarity)
+        np.maximum.at(best, pairs[:, 1], similarity)
+        # The first row of each cluster is kept; later rows are duplicates
+        first = pd.Series(np.arange(n_rows)).groupby(labels).transform('min').to_numpy()
+        sizes = np.bincount(labels)
+        rows = pd.DataFrame({
+            'Cluster': np.where(sizes[labels] > 1, labels, -1),
+            'Duplicate': np.arange(n_rows) != first,
+            'Similarity': best
+        }, index=df.index)
+        return rows, self.merge_report(df, rows, columns)
+
+    def merge_report(self, df, rows, columns):
+        """One line per cluster: size, the row kept, the rows merged into it and the identity variants seen."""
+        clustered = rows[rows['Cluster'] >= 0]
+        if clustered.empty:
+            return pd.DataFrame(columns=['Cluster', 'Size', 'Kept Row', 'Merged Rows', 'Max Similarity'])
+        groups = clustered.groupby('Cluster')
+        index = clustered.index.to_series()
+        report = pd.DataFrame({
+            'Size': groups.size(),
+            'Kept Row': index[~clustered['Duplicate']].groupby(clustered.loc[~clustered['Duplicate'], 'Cluster']).first(),
+            'Merged Rows': index[clustered['Duplicate']].groupby(clustered.loc[clustered['Duplicate'], 'Cluster']).agg(list),
+            'Max Similarity': groups['Similarity'].max().round(3)
+        })
+        for col in [col for col in columns.values() if col]:
+            values = df.loc[clustered.index, col].astype(str)
+            report[f"{col} (variants)"] = values.groupby(clustered['Cluster']).agg(lambda variants: " | ".join(pd.unique(variants)))
+        return report.rename_axis('Cluster').reset_index().sort_values(by='Size', ascending=False)
+
+    def _banding(self):
+        """Bands x rows with the LSH S-curve midpoint (1/b)^(1/r) well below ``threshold``, so true matches are rarely missed.
+
+        Pairs linked by an exact email or phone are blocked directly and do not rely on the bands.
+        """
+        options = [(self.num_perm // r, r) for r in range(1, self.num_perm + 1)]
+        return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - (self.threshold - 0.2)))
+
+    def _minhash(self, tokens):
+        # Absent tokens (0) are replaced by a token the row does have, so they never lower the minimum
+        tokens = np.where(tokens > 0, tokens, tokens.max(axis=1, keepdims=True))
+        signature = np.empty((len(tokens), self.num_perm), dtype=np.uint16)
+        for perm in range(self.num_perm):
+            hashed = (self._a[perm] * tokens + self._b[perm]) >> np.uint64(32)
+            signature[:, perm] = hashed.min(axis=1) & np.uint64(0xFFFF)
+        return signature
\ No newline at end of file
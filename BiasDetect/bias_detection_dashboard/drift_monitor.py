@@ -0,0 +1,171 @@
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from tracer import traced
+
+
+def _two_sided_p(z):
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def _holm(p_values):
+    """Holm step-down adjusted p-values, controlling the family-wise error rate over all tests."""
+    order = np.argsort(p_values, kind='stable')
+    m = len(p_values)
+    adjusted = np.empty(m)
+    running = 0.0
+    for rank, index in enumerate(order):
+        running = max(running, min(1.0, (m - rank) * p_values[index]))
+        adjusted[index] = running
+    return adjusted
+
+
+def _log_di(counts):
+    """Log disparate impact and its delta-method variance from per-group [n, positives] counts."""
+    rates = {group: pos / n for group, (n, pos) in counts.items() if n > 0}
+    if len(rates) < 2:
+        return None, None
+    low = min(rates, key=rates.get)
+    high = max(rates, key=rates.get)
+    if rates[low] <= 0 or rates[high] <= 0:
+        return None, None
+    variance = sum((1 - rates[g]) / (counts[g][0] * rates[g]) for g in (low, high))
+    return math.log(rates[low] / rates[high]), variance
+
+
+@traced
+class DriftMonitor:
+    """Fairness drift across audited dataset versions.
+
+    Each version is reduced to per-group ``[rows, positives]`` counts for every sensitive column,
+    appended to ``snapshots.jsonl``. ``state.json`` keeps the counts of the last ``window`` versions
+    and their running totals, so a new batch is compared against the window and then folded in
+    without rescanning any history. All tests of one batch are Holm-adjusted together, so ``alpha``
+    bounds the chance of any false alert per recorded version. Recording an existing version label
+    replaces that version.
+    """
+
+    def __init__(self, monitor_dir=None, window=6, alpha=0.05):
+        # Snapshots outlive the process, so they go in the user's data directory rather than a temp dir
+        self.monitor_dir = monitor_dir or os.environ.get('BIAS_DASHBOARD_MONITOR_DIR', os.path.join(os.path.expanduser('~'), '.bias_dashboard', 'monitoring'))
+        self.window = window
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        os.makedirs(self.monitor_dir, exist_ok=True)
+        self._snapshots_path = os.path.join(self.monitor_dir, 'snapshots.jsonl')
+        self._state_path = os.path.join(self.monitor_dir, 'state.json')
+
+    def group_counts(self, df, sensitive_col, target_col, edges=None):
+        """Per-group [rows, positives]; continuous columns are cut at ``edges`` so groups stay comparable across versions."""
+        data = df[[sensitive_col, target_col]].dropna()
+        groups = data[sensitive_col]
+        if edges is not None:
+            groups = pd.cut(groups, bins=edges, include_lowest=True)
+        grouped = data[target_col].astype(float).groupby(groups, observed=True).agg(['size', 'sum'])
+        return {str(group): [int(row['size']), float(row['sum'])] for group, row in grouped.iterrows()}
+
+    def record(self, df, version, sensitive_cols, target_col):
+        """Snapshot ``df`` as ``version``, test it against the current window and return the flagged changes."""
+        with self._lock:
+            state = self._load_state()
+            snapshot = {'version': str(version), 'recorded': time.time(), 'target': target_col, 'columns': {}}
+            results = []
+            for col in sensitive_cols:
+                key = f"{col}|{target_col}"
+                series = state.setdefault(key, {'edges': None, 'window': [], 'totals': {}})
+                if series['edges'] is None and pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > 10:
+                    # Fix equal-width edges on first sight, widened so later versions rarely fall outside
+                    low, high = float(df[col].min()), float(df[col].max())
+                    span = high - low
+                    series['edges'] = np.linspace(low - 0.5 * span, high + 0.5 * span, 11).tolist()
+                counts = self.group_counts(df, col, target_col, series['edges'])
+                snapshot['columns'][col] = counts
+                # A re-recorded version replaces its earlier counts instead of being pooled twice
+                for entry in [entry for entry in series['window'] if entry['version'] == str(version)]:
+                    series['window'].remove(entry)
+                    self._subtract(series, entry['counts'])
+                results.extend(self._compare(col, counts, series['totals'], len(series['window'])))
+
+                series['window'].append({'version': str(version), 'counts': counts})
+                for group, (n, pos) in counts.items():
+                    total = series['totals'].setdefault(group, [0, 0.0])
+                    total[0] += n
+                    total[1] += pos
+                while len(series['window']) > self.window:
+                    self._subtract(series, series['window'].pop(0)['counts'])
+
+            with open(self._snapshots_path, 'a') as f:
+                f.write(json.dumps(snapshot) + '\n')
+            self._save_state(state)
+        alerts = pd.DataFrame(results, columns=['Column', 'Metric', 'Group', 'Window Value', 'Batch Value', 'p-value'])
+        alerts['Adjusted p-value'] = _holm(alerts['p-value'].to_numpy()) if len(alerts) else []
+        alerts['Flagged'] = alerts['Adjusted p-value'] < self.alpha
+        return alerts
+
+    def history(self, sensitive_col, target_col):
+        """Disparate impact and per-group selection rates for every recorded version."""
+        rows = {}
+        if not os.path.exists(self._snapshots_path):
+            return pd.DataFrame()
+        with open(self._snapshots_path) as f:
+            for line in f:
+                snapshot = json.loads(line)
+                counts = snapshot['columns'].get(sensitive_col)
+                if snapshot['target'] != target_col or counts is None:
+                    continue
+                rates = {group: pos / n for group, (n, pos) in counts.items() if n > 0}
+                row = {'Version': snapshot['version'], 'Rows': sum(n for n, _ in counts.values())}
+                row['Disparate Impact'] = min(rates.values()) / max(rates.values()) if len(rates) > 1 and max(rates.values()) > 0 else np.nan
+                row.update({f"Selection Rate ({group})": rate for group, rate in rates.items()})
+                # The latest snapshot of a re-recorded version wins
+                rows[snapshot['version']] = row
+        return pd.DataFrame(list(rows.values()))
+
+    def window_versions(self, sensitive_col, target_col):
+        state = self._load_state()
+        return [entry['version'] for entry in state.get(f"{sensitive_col}|{target_col}", {}).get('window', [])]
+
+    def _compare(self, col, batch, window, window_size):
+        if window_size == 0:
+            return []
+        results = []
+        for group, (n_batch, pos_batch) in batch.items():
+            n_window, pos_window = window.get(group, [0, 0.0])
+            if n_batch == 0 or n_window == 0:
+                continue
+            p_batch, p_window = pos_batch / n_batch, pos_window / n_window
+            pooled = (pos_batch + pos_window) / (n_batch + n_window)
+            se = math.sqrt(pooled * (1 - pooled) * (1 / n_batch + 1 / n_window))
+            p_value = _two_sided_p((p_batch - p_window) / se) if se > 0 else 1.0
+            results.append([col, 'Selection Rate', group, p_window, p_batch, p_value])
+
+        log_di_batch, var_batch = _log_di(batch)
+        log_di_window, var_window = _log_di(window)
+        if log_di_batch is not None and log_di_window is not None:
+            se = math.sqrt(var_batch + var_window)
+            p_value = _two_sided_p((log_di_batch - log_di_window) / se) if se > 0 else 1.0
+            results.append([col, 'Disparate Impact', 'All', math.exp(log_di_window), math.exp(log_di_batch), p_value])
+        return results
+
+    def _subtract(self, series, counts):
+        for group, (n, pos) in counts.items():
+            series['totals'][group][0] -= n
+            series['totals'][group][1] -= pos
+        series['totals'] = {group: total for group, total in series['totals'].items() if total[0] > 0}
+
+    def _load_state(self):
+        if not os.path.exists(self._state_path):
+            return {}
+        with open(self._state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        tmp_path = f"{self._state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._state_path)
\ No newline at end of file
@@ -0,0 +1,104 @@
+import time
+
+import pandas as pd
+from openpyxl import load_workbook
+from tracer import traced
+
+
+@traced
+class ExcelLoader:
+    """Streaming reader for .xlsx workbooks.
+
+    Sheets are opened in openpyxl's read-only mode, which parses rows as they are iterated instead
+    of building the whole XML DOM. Rows are converted in chunks straight into typed columns, so only
+    the selected columns of one chunk are ever held as Python objects.
+    """
+
+    def __init__(self, chunk_rows=50000):
+        self.chunk_rows = chunk_rows
+
+    def list_sheets(self, file):
+        workbook = self._open(file)
+        try:
+            return workbook.sheetnames
+        finally:
+            workbook.close()
+
+    def read_header(self, file, sheet):
+        """Return the column names of ``sheet`` without parsing its data rows."""
+        workbook = self._open(file)
+        try:
+            first_row = next(workbook[sheet].iter_rows(max_row=1, values_only=True), ())
+            return self._column_names(first_row)
+        finally:
+            workbook.close()
+
+    def load(self, file, sheets=None, columns=None, progress_callback=None):
+        """Load ``columns`` from ``sheets`` (default: first sheet, all columns) into one DataFrame.
+
+        ``progress_callback(sheet, rows_done, total_rows, rows_per_sec)`` is called after every
+        chunk; ``total_rows`` is None when the workbook does not record its dimensions.
+        """
+        workbook = self._open(file)
+        try:
+            sheets = sheets or workbook.sheetnames[:1]
+            frames = []
+            for sheet in sheets:
+                df = self._load_sheet(workbook[sheet], sheet, columns, progress_callback)
+                if len(sheets) > 1:
+                    df['Sheet'] = sheet
+                frames.append(df)
+        finally:
+            workbook.close()
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def _load_sheet(self, worksheet, sheet, columns, progress_callback):
+        header = self._column_names(next(worksheet.iter_rows(max_row=1, values_only=True), ()))
+        if columns:
+            missing = [col for col in columns if col not in header]
+            if missing:
+                raise ValueError(f"Columns not found in sheet {sheet}: {', '.join(missing)}")
+            indices = [header.index(col) for col in columns]
+        else:
+            indices = list(range(len(header)))
+        names = [header[i] for i in indices]
+        # Only cells between the first and last selected column are materialised by openpyxl
+        first_col = min(indices, default=0)
+        rows = worksheet.iter_rows(min_row=2, min_col=first_col + 1, max_col=max(indices, default=0) + 1, values_only=True)
+        indices = [i - first_col for i in indices]
+        total_rows = worksheet.max_row - 1 if worksheet.max_row else None
+
+        chunks = []
+        chunk = []
+        rows_done = 0
+        start = time.perf_counter()
+        for row in rows:
+            if not any(value is not None for value in row):
+                continue
+            chunk.append(tuple(row[i] if i < len(row) else None for i in indices))
+            if len(chunk) >= self.chunk_rows:
+                chunks.append(pd.DataFrame.from_records(chunk, columns=names))
+                rows_done += len(chunk)
+                chunk = []
+                if progress_callback:
+                    progress_callback(sheet, rows_done, total_rows, rows_done / (time.perf_counter() - start))
+        if chunk or not chunks:
+            chunks.append(pd.DataFrame.from_records(chunk, columns=names))
+            rows_done += len(chunk)
+        if progress_callback:
+            progress_callback(sheet, rows_done, rows_done, rows_done / max(time.perf_counter() - start, 1e-9))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def _open(self, file):
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        return load_workbook(file, read_only=True, data_only=True)
+
+    def _column_names(self, row):
+        names = []
+        for i, value in enumerate(row):
+            name = str(value) if value is not None else f"Unnamed: {i}"
+            names.append(name if name not in names else f"{name}.{i}")
+        return names
\ No newline at end of file
@@ -0,0 +1,166 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+from matplotlib.figure import Figure
+from plotly.io.json import to_json_plotly
+
+from dataset_store import fingerprint
+from tracer import traced
+
+
+class _Entry:
+    def __init__(self, payload):
+        self.payload = payload
+        self.images = {}
+        self.hits = 0
+
+    @property
+    def nbytes(self):
+        return len(self.payload) + sum(len(image) for image in self.images.values() if image)
+
+
+def _render_matplotlib(spec, width, height):
+    """Static rendering of bar and line charts without kaleido; other chart types return None."""
+    traces = spec.get('data', [])
+    if not traces or any(trace.get('type') not in ('bar', 'scatter') for trace in traces):
+        return None
+    layout = spec.get('layout', {})
+    fig = Figure(figsize=(width / 100, height / 100), dpi=100)
+    ax = fig.subplots()
+    bars = [trace for trace in traces if trace['type'] == 'bar']
+    categories = list(dict.fromkeys(
+        label for trace in bars for label in (trace.get('y') if trace.get('orientation') == 'h' else trace.get('x')) or []
+    ))
+    positions = {label: i for i, label in enumerate(categories)}
+    width_per_bar = 0.8 / max(1, len(bars))
+    for i, trace in enumerate(bars):
+        horizontal = trace.get('orientation') == 'h'
+        labels, values = (trace['y'], trace['x']) if horizontal else (trace['x'], trace['y'])
+        offsets = np.array([positions[label] for label in labels]) + (i - (len(bars) - 1) / 2) * width_per_bar
+        color = trace.get('marker', {}).get('color', '#3B82F6')
+        draw = ax.barh if horizontal else ax.bar
+        draw(offsets, values, width_per_bar, color=color, label=trace.get('name'))
+    if bars:
+        horizontal = bars[0].get('orientation') == 'h'
+        (ax.set_yticks if horizontal else ax.set_xticks)(range(len(categories)))
+        (ax.set_yticklabels if horizontal else ax.set_xticklabels)([str(label) for label in categories])
+    for trace in traces:
+        if trace['type'] == 'scatter':
+            mode = trace.get('mode', 'lines')
+            x, y = np.array(trace['x'], dtype=float), np.array(trace['y'], dtype=float)
+            color = trace.get('marker', {}).get('color') or trace.get('line', {}).get('color')
+            ax.plot(x, y, '-' if 'lines' in mode else 'o', color=color)
+            for label, px, py in zip(trace.get('text') or [], x, y):
+                ax.annotate(str(label), (px, py), ha='center', va='bottom')
+    for shape in layout.get('shapes', []):
+        # Threshold lines from add_hline / add_vline span the whole axis domain
+        line = shape.get('line', {})
+        style = {'color': line.get('color', 'black'), 'linestyle': '--' if line.get('dash') else '-'}
+        if shape.get('xref') == 'x domain':
+            ax.axhline(shape['y0'], **style)
+        elif shape.get('yref') == 'y domain':
+            ax.axvline(shape['x0'], **style)
+    title = layout.get('title', {})
+    ax.set_title(title.get('text', '') if isinstance(title, dict) else title)
+    ax.set_xlabel(layout.get('xaxis', {}).get('title', {}).get('text', ''))
+    ax.set_ylabel(layout.get('yaxis', {}).get('title', {}).get('text', ''))
+    if len(bars) > 1:
+        ax.legend()
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+@traced
+class FigureCache:
+    """Process-wide cache of Plotly figures shared by reruns and browser sessions.
+
+    Entries are keyed by (dataset fingerprint, chart type, parameters) and hold the figure as
+    compact JSON: the expanded layout template, most of a figure's serialised size, is dropped
+    and re-applied when the figure is rebuilt. Static PNG renderings for the PDF report are made
+    at most once per entry and size, with kaleido when installed and otherwise with matplotlib for
+    bar and line charts. Entries are evicted least-recently-used first beyond ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._builds = 0
+
+    def key(self, chart, params, df=None):
+        content = repr((fingerprint(df) if df is not None else None, chart, params))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def figure(self, chart, params, build, df=None):
+        """The cached figure for ``chart`` and ``params``, calling ``build()`` only on a miss.
+
+        ``params`` must capture everything the figure depends on besides ``df``; a new Figure is
+        returned on each call, so callers may modify it.
+        """
+        return go.Figure(json.loads(self._entry(chart, params, build, df).payload))
+
+    def image(self, chart, params, build, df=None, width=640, height=360):
+        """PNG bytes of the cached figure, or None when it cannot be rendered statically."""
+        entry = self._entry(chart, params, build, df)
+        size = (width, height)
+        with self._lock:
+            if size in entry.images:
+                return entry.images[size]
+        # Rendered outside the lock; if two sessions race, the first stored image wins
+        spec = json.loads(entry.payload)
+        try:
+            image = go.Figure(spec).to_image(format='png', width=width, height=height)
+        except (ImportError, ValueError):
+            # kaleido is not installed
+            image = _render_matplotlib(spec, width, height)
+        with self._lock:
+            image = entry.images.setdefault(size, image)
+        self._evict()
+        return image
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(entry.nbytes for entry in self._entries.values()),
+                'hits': sum(entry.hits for entry in self._entries.values()),
+                'builds': self._builds
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _entry(self, chart, params, build, df):
+        key = self.key(chart, params, df)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                return entry
+        spec = build().to_plotly_json()
+        spec['layout'].pop('template', None)
+        entry = _Entry(to_json_plotly(spec))
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            self._builds += 1
+        self._evict()
+        return entry
+
+    def _evict(self):
+        with self._lock:
+            total = sum(entry.nbytes for entry in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, entry = self._entries.popitem(last=False)
+                total -= entry.nbytes
+
+
+figure_cache = FigureCache()
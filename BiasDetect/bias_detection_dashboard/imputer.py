@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from schema import get_schema
+from tracer import traced
+
+GLOBAL = 'global'
+GROUP_MEAN = 'group_mean'
+GROUP_MEDIAN = 'group_median'
+KNN = 'knn'
+METHODS = {
+    GLOBAL: "Global mean / mode",
+    GROUP_MEAN: "Mean / mode per sensitive group",
+    GROUP_MEDIAN: "Median / mode per sensitive group",
+    KNN: "Nearest neighbours within sensitive group"
+}
+
+
+def _group_keys(df, group_cols, bins=5):
+    """One code per row for the combination of ``group_cols``; numeric columns with many values are binned."""
+    if not group_cols:
+        return np.zeros(len(df), dtype=np.int64)
+    keys = pd.DataFrame({
+        col: pd.cut(df[col], bins=bins, include_lowest=True) if pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > bins else df[col]
+        for col in group_cols
+    })
+    return keys.groupby(group_cols, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+
+
+def _group_modes(values, groups):
+    """Most frequent non-missing value of ``values`` within each group, as a per-row Series (NaN where a group has none)."""
+    codes, uniques = pd.factorize(values)
+    known = codes >= 0
+    counts = pd.DataFrame({'group': groups[known], 'code': codes[known]}).value_counts()
+    best = counts.reset_index().drop_duplicates('group').set_index('group')['code']
+    per_row = pd.Series(groups).map(best).to_numpy()
+    filled = np.where(np.isnan(per_row), -1, per_row).astype(np.int64)
+    result = pd.Series(uniques.take(np.maximum(filled, 0)) if len(uniques) else np.full(len(values), np.nan), index=values.index)
+    return result.where(filled >= 0)
+
+
+@traced
+class Imputer:
+    """Fills missing values, optionally within sensitive groups so group differences survive cleaning.
+
+    ``global`` reproduces the original mean/mode filling. The group methods fill numeric columns
+    with the mean or median of the row's sensitive group, computed in one grouped transform over
+    all columns, and text columns with the group mode; groups with fewer than ``min_group_size``
+    observed values fall back to the global statistic. ``knn`` averages the ``n_neighbors``
+    nearest complete rows of the same group, measured on the standardised numeric columns the row
+    does have: rows are queried by missing-value pattern, each against a KD-tree over those columns
+    only (built on at most ``max_index_rows`` rows, queried in ``chunk_rows`` chunks), so it scales
+    to millions of rows.
+    """
+
+    def __init__(self, method=GLOBAL, n_neighbors=5, min_group_size=5, chunk_rows=50000, max_index_rows=200000, seed=0):
+        if method not in METHODS:
+            raise ValueError(f"Unknown imputation method {method}; use one of {', '.join(METHODS)}.")
+        self.method = method
+        self.n_neighbors = n_neighbors
+        self.min_group_size = min_group_size
+        self.chunk_rows = chunk_rows
+        self.max_index_rows = max_index_rows
+        self.seed = seed
+
+    def fill(self, df, group_cols=()):
+        """Fill missing values of ``df`` in place; sensitive columns themselves are filled globally."""
+        schema = get_schema(df)
+        numeric_cols = [col for col in schema.numeric_columns() if df[col].isna().any()]
+        text_cols = [col for col in schema.text_columns() if df[col].isna().any()]
+        if self.method == GLOBAL or not group_cols:
+            self._fill_global(df, numeric_cols, text_cols)
+            return
+        group_cols = [col for col in group_cols if col in df.columns]
+        groups = _group_keys(df, group_cols)
+        own_numeric = [col for col in numeric_cols if col not in group_cols]
+        own_text = [col for col in text_cols if col not in group_cols]
+
+        if self.method == KNN:
+            features = [col for col in schema.numeric_columns() if col not in group_cols]
+            self._fill_knn(df, groups, features, own_numeric)
+        elif own_numeric:
+            grouped = df[own_numeric].groupby(groups)
+            stat = 'mean' if self.method == GROUP_MEAN else 'median'
+            fills = grouped.transform(stat).where(grouped.transform('count') >= self.min_group_size)
+            df[own_numeric] = df[own_numeric].fillna(fills)
+        for col in own_text:
+            counts = df[col].notna().groupby(groups).transform('sum')
+            df[col] = df[col].fillna(_group_modes(df[col], groups).where(counts >= self.min_group_size))
+        # Sensitive columns and groups too small for their own statistic
+        self._fill_global(df, numeric_cols, text_cols)
+
+    def _fill_global(self, df, numeric_cols, text_cols):
+        if numeric_cols:
+            df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
+        if text_cols:
+            df[text_cols] = df[text_cols].fillna(df[text_cols].mode().iloc[0])
+
+    def _fill_knn(self, df, groups, features, targets):
+        if not features or not targets:
+            return
+        values = df[features].to_numpy(dtype=float)
+        missing = np.isnan(values)
+        # Standardise so no column dominates the distance
+        std = np.nanstd(values, axis=0)
+        scaled = (values - np.nanmean(values, axis=0)) / np.where(std > 0, std, 1)
+        # Only target columns have gaps, so complete rows can donate to any query
+        complete = ~missing.any(axis=1)
+        rng = np.random.default_rng(self.seed)
+        filled = values.copy()
+
+        order = np.argsort(groups, kind='stable')
+        starts = np.flatnonzero(np.r_[True, groups[order][1:] != groups[order][:-1]])
+        for rows in np.split(order, starts[1:]):
+            queries = rows[~complete[rows]]
+            if len(queries) == 0:
+                continue
+            donors = rows[complete[rows]]
+            if len(donors) < self.n_neighbors:
+                continue  # Left to the global fallback
+            if len(donors) > self.max_index_rows:
+                donors = rng.choice(donors, self.max_index_rows, replace=False)
+            patterns, inverse = np.unique(missing[queries], axis=0, return_inverse=True)
+            for p, pattern in enumerate(patterns):
+                observed = ~pattern
+                if not observed.any():
+                    continue  # Nothing to measure distance on; left to the global fallback
+                tree = KDTree(scaled[donors][:, observed])
+                pattern_rows = queries[inverse.ravel() == p]
+                for start in range(0, len(pattern_rows), self.chunk_rows):
+                    chunk = pattern_rows[start:start + self.chunk_rows]
+                    _, neighbours = tree.query(scaled[chunk][:, observed], k=self.n_neighbors)
+                    filled[np.ix_(chunk, pattern)] = values[donors[neighbours]][:, :, pattern].mean(axis=1)
+        for col in targets:
+            df[col] = df[col].fillna(pd.Series(filled[:, features.index(col)], index=df.index))
\ No newline at end of file
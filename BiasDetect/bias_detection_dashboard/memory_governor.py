@@ -0,0 +1,334 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from dataset_store import dataset_store
+from tracer import traced
+
+
+class _Spilled:
+    """Placeholder left in ``st.session_state`` for a value that currently lives on disk."""
+
+    def __repr__(self):
+        return "<spilled to disk>"
+
+
+SPILLED = _Spilled()
+
+_sizes = {}
+
+
+def _frame_bytes(df):
+    """Approximate memory of a frame, sampling object columns instead of measuring every string; cached per frame."""
+    cached = _sizes.get(id(df))
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+    size = int(df.memory_usage(index=True, deep=False).sum())
+    for col in df.columns[df.dtypes.to_numpy() == object]:
+        sample = df[col].iloc[:1000]
+        if len(sample):
+            size += int(sample.memory_usage(index=False, deep=True) - sample.memory_usage(index=False, deep=False)) * len(df) // len(sample)
+    key = id(df)
+
+    def forget(ref):
+        if _sizes.get(key, (None,))[0] is ref:
+            del _sizes[key]
+    _sizes[key] = (weakref.ref(df, forget), size)
+    return size
+
+
+def _reachable(value, found, seen, depth=0):
+    """Collect ``{id: bytes}`` of the frames and arrays reachable from ``value``, skipping dataset store frames."""
+    if id(value) in seen or depth > 6:
+        return
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        if not dataset_store.owns(value):
+            found[id(value)] = _frame_bytes(value)
+    elif isinstance(value, pd.Series):
+        found[id(value)] = int(value.memory_usage(index=True, deep=False))
+    elif isinstance(value, np.ndarray):
+        found[id(value)] = value.nbytes
+    elif isinstance(value, dict):
+        for item in value.values():
+            _reachable(item, found, seen, depth + 1)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            _reachable(item, found, seen, depth + 1)
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        _reachable(vars(value), found, seen, depth + 1)
+
+
+def footprint(value):
+    """Bytes held by frames and arrays reachable from ``value``; shared frames and dataset store frames are not counted."""
+    found = {}
+    _reachable(value, found, set())
+    return sum(found.values())
+
+
+class _SpillPickler(pickle.Pickler):
+    """Writes every DataFrame it meets to its own Parquet file and pins frames shared through the dataset store.
+
+    ``frames`` is shared by the picklers of one spill, so a frame held by several values is written once.
+    """
+
+    def __init__(self, file, directory, pinned, frames):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.pinned = pinned
+        self.frames = frames
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, pd.DataFrame):
+            return None
+        if id(obj) in self.frames:
+            return self.frames[id(obj)]
+        if dataset_store.owns(obj):
+            self.pinned.append(obj)
+            pid = ('pinned', len(self.pinned) - 1)
+        else:
+            path = os.path.join(self.directory, f"frame_{len(self.frames)}.parquet")
+            try:
+                obj.to_parquet(path, index=True)
+                pid = ('parquet', path)
+            except Exception:
+                # Columns Parquet cannot store (e.g. mixed object types) are pickled instead
+                path = path.replace('.parquet', '.pkl')
+                obj.to_pickle(path)
+                pid = ('pickle', path)
+        self.frames[id(obj)] = pid
+        return pid
+
+
+class _SpillUnpickler(pickle.Unpickler):
+    def __init__(self, file, pinned, frames):
+        super().__init__(file)
+        self.pinned = pinned
+        self.frames = frames
+
+    def persistent_load(self, pid):
+        if pid not in self.frames:
+            kind, location = pid
+            if kind == 'pinned':
+                self.frames[pid] = self.pinned[location]
+            elif kind == 'parquet':
+                self.frames[pid] = pd.read_parquet(location)
+            else:
+                self.frames[pid] = pd.read_pickle(location)
+        return self.frames[pid]
+
+
+class _Session:
+    def __init__(self, session_id, state):
+        self.session_id = session_id
+        self.state = weakref.ref(state)
+        self.last_access = time.time()
+        self.run = None
+        self.footprint = 0
+        self.sizes = {}
+        self.spilled = None
+        self.spilled_bytes = 0
+        self.pinned = []
+
+    @property
+    def busy(self):
+        return self.run is not None and self.run.is_alive()
+
+
+def _session_state(ctx):
+    """The session state behind a script run, which lives exactly as long as the browser session.
+
+    ``ctx.session_state`` is a thread-safe wrapper replaced on every run. Should the attribute
+    holding the state move, the wrapper is used instead: it dies with the run, so the session is
+    forgotten rather than spilled.
+    """
+    return getattr(ctx.session_state, '_state', ctx.session_state)
+
+
+@traced
+class MemoryGovernor:
+    """Keeps the combined memory of all browser sessions' frames and artifacts under a host-wide budget.
+
+    Every page run records its session's footprint (frames, arrays and objects holding them, not
+    counting datasets shared through the dataset store) when it ends. Sessions idle for
+    ``idle_seconds`` are spilled: each large value is pickled to a per-session directory, with every
+    DataFrame written as its own Parquet file, and replaced by a placeholder. If the resident total
+    still exceeds ``budget_bytes``, the least recently used sessions that have been idle for at least
+    ``min_idle_seconds`` are spilled too. A session is busy while the script thread that called
+    :func:`restore_session` is running and is never spilled while busy; idle time counts from when
+    its last run was seen to end.
+    A spilled session is reloaded on its next page run. A daemon thread applies the idle rule every
+    ``interval`` seconds.
+    """
+
+    def __init__(self, spill_dir=None, budget_bytes=None, idle_seconds=None, min_idle_seconds=60, min_value_bytes=1024 * 1024, interval=60):
+        self.spill_dir = spill_dir or os.environ.get('BIAS_DASHBOARD_SPILL_DIR', os.path.join(tempfile.gettempdir(), 'bias_dashboard_spill'))
+        self.budget_bytes = budget_bytes or int(os.environ.get('BIAS_DASHBOARD_SESSION_BUDGET_MB', '4096')) * 1024 * 1024
+        self.idle_seconds = idle_seconds or int(os.environ.get('BIAS_DASHBOARD_IDLE_MINUTES', '30')) * 60
+        self.min_idle_seconds = min_idle_seconds
+        self.min_value_bytes = min_value_bytes
+        self.interval = interval
+        self._sessions = {}
+        self._lock = threading.RLock()
+        self._reaper = None
+
+    def touch(self, session_id, state, run=None):
+        """Start a page run of ``session_id``: reload it if spilled and keep it busy while the ``run`` thread is alive."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.state() is not state:
+                session = self._sessions[session_id] = _Session(session_id, state)
+            session.last_access = time.time()
+            if session.spilled is not None:
+                self._restore(session)
+            session.run = run
+            if run is None:
+                # Without a run to wait for, account for the session now
+                session.footprint = self._footprint(session, state)
+            self._enforce(exclude=session_id)
+            self._start_reaper()
+
+    def spill(self, session_id):
+        """Move an idle session's large values to disk; returns the bytes released."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            state = session.state() if session is not None else None
+            if state is None or session.busy or session.spilled is not None:
+                return 0
+            values = state.filtered_state
+            candidates = [key for key, value in values.items() if value is not SPILLED and footprint(value) >= self.min_value_bytes]
+            if not candidates:
+                return 0
+            directory = os.path.join(self.spill_dir, session_id)
+            os.makedirs(directory, exist_ok=True)
+            pinned, frames, spilled = [], {}, {}
+            for key in candidates:
+                path = os.path.join(directory, f"value_{len(spilled)}.pkl")
+                try:
+                    with open(path, 'wb') as file:
+                        _SpillPickler(file, directory, pinned, frames).dump(values[key])
+                except Exception:
+                    # Values that cannot be pickled (e.g. a running background worker) stay in memory
+                    os.remove(path)
+                    continue
+                spilled[key] = path
+            if not spilled:
+                return 0
+            released = footprint({key: values[key] for key in spilled})
+            for key in spilled:
+                state[key] = SPILLED
+            session.spilled, session.spilled_bytes, session.pinned = spilled, released, pinned
+            session.footprint = max(0, session.footprint - released)
+            session.sizes = {}
+            return released
+
+    def forget(self, session_id):
+        """Drop a closed session: its spill files and its references to shared datasets."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            shutil.rmtree(os.path.join(self.spill_dir, session_id), ignore_errors=True)
+        dataset_store.release(session_id)
+
+    def stats(self):
+        with self._lock:
+            self._settle()
+            return pd.DataFrame([{
+                'session': session.session_id[:8],
+                'resident_mb': session.footprint / 1e6,
+                'spilled_mb': session.spilled_bytes / 1e6 if session.spilled is not None else 0.0,
+                'spilled_keys': ", ".join(session.spilled or []),
+                'busy': session.busy,
+                'idle_s': 0 if session.busy else round(time.time() - session.last_access)
+            } for session in self._sessions.values()])
+
+    def _footprint(self, session, state):
+        """Session footprint; values that are themselves frames or arrays are measured once per object."""
+        found, seen, sizes = {}, set(), {}
+        for key, value in state.filtered_state.items():
+            cached = session.sizes.get(key)
+            if cached is not None and cached[0]() is value:
+                found.update(cached[1])
+                sizes[key] = cached
+                continue
+            if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+                own = {}
+                _reachable(value, own, set())
+                sizes[key] = (weakref.ref(value), own)
+                found.update(own)
+            else:
+                # Containers and objects (e.g. the pipeline) change in place, so they are walked every time
+                _reachable(value, found, seen)
+        session.sizes = sizes
+        return sum(found.values())
+
+    def _restore(self, session):
+        state = session.state()
+        pinned, frames = session.pinned, {}
+        for key, path in session.spilled.items():
+            with open(path, 'rb') as file:
+                value = _SpillUnpickler(file, pinned, frames).load()
+            # Values the session overwrote while spilled are newer than the copy on disk
+            if key not in state or state[key] is SPILLED:
+                state[key] = value
+        session.spilled, session.spilled_bytes, session.pinned = None, 0, []
+        shutil.rmtree(os.path.join(self.spill_dir, session.session_id), ignore_errors=True)
+
+    def _settle(self):
+        """Sessions whose run has ended since the last check become idle now, with their footprint brought up to date."""
+        for session in self._sessions.values():
+            state = session.state()
+            if session.run is not None and not session.run.is_alive() and state is not None:
+                session.run = None
+                session.last_access = time.time()
+                session.footprint = self._footprint(session, state)
+
+    def _enforce(self, exclude=None):
+        self._settle()
+        now = time.time()
+        for session_id, session in list(self._sessions.items()):
+            if session.state() is None:
+                self.forget(session_id)
+            elif session_id != exclude and not session.busy and now - session.last_access >= self.idle_seconds:
+                self.spill(session_id)
+        resident = sum(session.footprint for session in self._sessions.values())
+        for session in sorted(self._sessions.values(), key=lambda session: session.last_access):
+            if resident <= self.budget_bytes:
+                break
+            if session.session_id != exclude and not session.busy and now - session.last_access >= self.min_idle_seconds:
+                resident -= self.spill(session.session_id)
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+
+        def reap():
+            while True:
+                time.sleep(self.interval)
+                with self._lock:
+                    self._enforce()
+        self._reaper = threading.Thread(target=reap, daemon=True, name='memory-governor')
+        self._reaper.start()
+
+
+memory_governor = MemoryGovernor()
+
+
+def restore_session():
+    """Bring back this session's spilled values and mark it busy until this run ends; call at the top of every page."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    try:
+        # Streamlit runs each script run (and the reruns queued behind it) on its own thread
+        memory_governor.touch(ctx.session_id, _session_state(ctx), threading.current_thread())
+    except Exception as e:
+        st.error(f"Error restoring session data: {str(e)}", icon="❌")
\ No newline at end of file
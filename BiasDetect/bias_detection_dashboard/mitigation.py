@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from fairlearn.metrics import demographic_parity_ratio, equalized_odds_ratio
+from fairlearn.postprocessing import ThresholdOptimizer
+from fairlearn.reductions import DemographicParity, EqualizedOdds, ExponentiatedGradient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from bias_analyzer import BiasAnalyzer
+from dataset_store import fingerprint
+from ml_predictor import MLPredictor
+from tracer import traced
+
+BASELINE = 'RandomForest (baseline)'
+THRESHOLD = 'Threshold Optimizer'
+REDUCTION = 'Exponentiated Gradient'
+
+THRESHOLD_CONSTRAINTS = ['demographic_parity', 'true_positive_rate_parity', 'equalized_odds']
+REDUCTION_CONSTRAINTS = {'Demographic Parity': DemographicParity, 'Equalized Odds': EqualizedOdds}
+# Loosest first, so a chain can stop once stricter bounds stop paying off
+DEFAULT_BOUNDS = [0.2, 0.1, 0.05, 0.02, 0.01]
+# Share of the training rows held out to tune the threshold optimisers
+VALIDATION_SIZE = 0.25
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Training and test data of the current comparison, set once per worker process
+_data = None
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+
+def _evaluate(method, constraint, strength, predictions, seconds):
+    X_test, y_test, A_test = _data['X_test'], _data['y_test'], _data['A_test']
+    return {
+        'Method': method,
+        'Constraint': constraint,
+        'Bound': strength,
+        'Accuracy': float((predictions == y_test).mean()),
+        'Disparate Impact': float(demographic_parity_ratio(y_test, predictions, sensitive_features=A_test)),
+        'Equalized Odds': float(equalized_odds_ratio(y_test, predictions, sensitive_features=A_test)),
+        'Selection Rate': float(predictions.mean()),
+        'Fit Time (s)': round(seconds, 2),
+        'Note': ''
+    }
+
+
+def _run_task(task):
+    """Fit one candidate (or the baseline and its post-processed variants) in a worker process."""
+    kind, constraint, strength, seed = task
+    X_train, y_train, A_train = _data['X_train'], _data['y_train'], _data['A_train']
+    X_test, A_test = _data['X_test'], _data['A_test']
+    start = time.perf_counter()
+    if kind == BASELINE:
+        # The baseline forest is fitted once and reused by every threshold optimiser. Thresholds are tuned
+        # on held-out rows: on its own training rows the forest's scores are nearly perfect.
+        X_fit, X_val, y_fit, y_val, A_fit, A_val = train_test_split(X_train, y_train, A_train, test_size=VALIDATION_SIZE, random_state=seed)
+        model = RandomForestClassifier(n_estimators=100, random_state=seed)
+        model.fit(X_fit, y_fit)
+        results = [_evaluate(BASELINE, 'None', None, model.predict(X_test), time.perf_counter() - start)]
+        for name in THRESHOLD_CONSTRAINTS:
+            step = time.perf_counter()
+            optimizer = ThresholdOptimizer(estimator=model, constraints=name, prefit=True, predict_method='predict_proba')
+            try:
+                optimizer.fit(X_val, y_val, sensitive_features=A_val)
+            except ValueError as e:
+                # e.g. a group whose training rows all share one label has no threshold to tune
+                results.append({'Method': THRESHOLD, 'Constraint': name.replace('_', ' ').title(), 'Bound': None, 'Note': str(e)})
+                continue
+            predictions = optimizer.predict(X_test, sensitive_features=A_test, random_state=seed)
+            results.append(_evaluate(THRESHOLD, name.replace('_', ' ').title(), None, predictions, time.perf_counter() - step))
+        return results
+    mitigator = ExponentiatedGradient(
+        DecisionTreeClassifier(max_depth=8, random_state=seed),
+        constraints=REDUCTION_CONSTRAINTS[constraint](difference_bound=strength)
+    )
+    mitigator.fit(X_train, y_train, sensitive_features=A_train)
+    predictions = mitigator.predict(X_test, random_state=seed)
+    return [_evaluate(REDUCTION, constraint, strength, predictions, time.perf_counter() - start)]
+
+
+def pareto_front(results):
+    """True for candidates no other candidate beats on both accuracy and Disparate Impact."""
+    accuracy = results['Accuracy'].fillna(0).to_numpy()
+    impact = results['Disparate Impact'].fillna(0).to_numpy()
+    dominated = ((accuracy[None, :] >= accuracy[:, None]) & (impact[None, :] >= impact[:, None])
+                 & ((accuracy[None, :] > accuracy[:, None]) | (impact[None, :] > impact[:, None]))).any(axis=1)
+    return ~dominated
+
+
+@traced
+class MitigationComparer:
+    """Trains constrained and post-processed models side by side and compares accuracy with fairness.
+
+    Candidates are the RandomForest baseline, fairlearn's ThresholdOptimizer on top of it for
+    several constraints, and ExponentiatedGradient reductions over a grid of constraint bounds.
+    Each reduction's grid is a chain from the loosest to the strictest bound; chains run concurrently
+    in a process pool that receives the data once per worker, and a chain stops early once
+    Disparate Impact is near 1, accuracy has fallen more than ``max_accuracy_drop`` below its
+    loosest candidate, or ``patience`` stricter bounds in a row brought no improvement. Results are
+    cached per dataset, target, sensitive column and candidate, so extending the grid only fits
+    the new bounds. Training uses at most ``max_train_rows`` rows.
+    """
+
+    def __init__(self, bounds=None, workers=None, max_train_rows=50000, max_accuracy_drop=0.15, patience=2, seed=42, cache_size=256):
+        self.bounds = sorted(bounds or DEFAULT_BOUNDS, reverse=True)
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.max_train_rows = max_train_rows
+        self.max_accuracy_drop = max_accuracy_drop
+        self.patience = patience
+        self.seed = seed
+        self.cache_size = cache_size
+
+    def compare(self, df, target_col, sensitive_col, progress_callback=None):
+        """One row per candidate with accuracy, Disparate Impact, Equalized Odds and a ``Pareto Optimal`` flag."""
+        try:
+            base_key = (fingerprint(df), target_col, sensitive_col, self.max_train_rows, self.seed)
+            chains = [[(BASELINE, None, None, self.seed)]]
+            chains += [[(REDUCTION, constraint, bound, self.seed) for bound in self.bounds] for constraint in REDUCTION_CONSTRAINTS]
+            total = sum(len(chain) for chain in chains)
+            results, data = [], None
+            positions = [0] * len(chains)
+            done = 0
+
+            pool, pending = None, {}
+            try:
+                while True:
+                    # Advance every idle chain, through cached candidates directly, otherwise via the pool
+                    for c, chain in enumerate(chains):
+                        while positions[c] is not None and positions[c] < len(chain) and c not in pending.values():
+                            task = chain[positions[c]]
+                            cached = self._cached(base_key + task)
+                            if cached is not None:
+                                results.extend(dict(row, Cached=True) for row in cached)
+                                done += 1
+                                positions[c] = self._advance(chain, positions[c], results)
+                                continue
+                            if pool is None:
+                                data = data or self._prepare(df, target_col, sensitive_col)
+                                pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(data,))
+                            pending[pool.submit(_run_task, task)] = c
+                            break
+                    if progress_callback:
+                        progress_callback(done, total)
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        c = pending.pop(future)
+                        rows = future.result()
+                        self._store(base_key + chains[c][positions[c]], rows)
+                        results.extend(dict(row, Cached=False) for row in rows)
+                        done += 1
+                        positions[c] = self._advance(chains[c], positions[c], results)
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+
+            frame = pd.DataFrame(results)
+            frame['Pareto Optimal'] = pareto_front(frame) & frame['Accuracy'].notna()
+            return frame.sort_values(by=['Disparate Impact', 'Accuracy'], ascending=False).reset_index(drop=True)
+        except Exception as e:
+            st.error(f"Error comparing mitigation strategies: {str(e)}", icon="❌")
+            return pd.DataFrame()
+
+    def _prepare(self, df, target_col, sensitive_col):
+        X, y, _ = MLPredictor().encode_features(df, target_col)
+        sensitive = BiasAnalyzer().bin_continuous_column(df[sensitive_col]).astype(str).to_numpy()
+        X_train, X_test, y_train, y_test, A_train, A_test = train_test_split(
+            X.to_numpy(dtype=np.float32), y.to_numpy(), sensitive, test_size=0.2, random_state=self.seed
+        )
+        if len(X_train) > self.max_train_rows:
+            keep = np.random.default_rng(self.seed).choice(len(X_train), self.max_train_rows, replace=False)
+            X_train, y_train, A_train = X_train[keep], y_train[keep], A_train[keep]
+        return {'X_train': X_train, 'y_train': y_train, 'A_train': A_train, 'X_test': X_test, 'y_test': y_test, 'A_test': A_test}
+
+    def _advance(self, chain, position, results):
+        """Index of the next bound to fit in a reduction chain, or None when the chain stops early."""
+        method, constraint = chain[position][:2]
+        if method == BASELINE:
+            return None
+        fitted = [row for row in results if row['Method'] == method and row['Constraint'] == constraint and row['Bound'] in self.bounds]
+        fitted.sort(key=lambda row: -row['Bound'])
+        latest = fitted[-1]
+        best = [row['Disparate Impact'] for row in fitted]
+        stalled = len(best) > self.patience and max(best[-self.patience:]) <= max(best[:-self.patience]) + 0.005
+        if latest['Disparate Impact'] >= 0.99 or latest['Accuracy'] < fitted[0]['Accuracy'] - self.max_accuracy_drop or stalled:
+            return None
+        return position + 1 if position + 1 < len(chain) else None
+
+    def _cached(self, key):
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key]
+        return None
+
+    def _store(self, key, rows):
+        with _cache_lock:
+            _cache[key] = rows
+            while len(_cache) > self.cache_size:
+                _cache.popitem(last=False)
\ No newline at end of file
@@ -4,7 +4,10 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 import streamlit as st
+from schema import get_schema
+from tracer import traced
 
+@traced
 class MLPredictor:
     def check_ml_readiness(self, df, sensitive_cols):
         score = 100.0
@@ -30,8 +33,8 @@ class MLPredictor:
             issues.append("Dataset too small (<100 rows)")
         
         # Check for numerical stability
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        if numeric_cols.any():
+        numeric_cols = get_schema(df).numeric_columns()
+        if numeric_cols:
             if df[numeric_cols].var().min() < 1e-6:
                 score -= 10
                 issues.append("Low variance in some numerical columns")
@@ -40,27 +43,140 @@ class MLPredictor:
         readiness = score >= 80
         return readiness, message, score
 
+    def encode_features(self, df, target_col):
+        """Label-encoded feature matrix, target and the classes of every encoded text column."""
+        df_copy = df.copy()
+        classes = {}
+        for col in get_schema(df).text_columns():
+            le = LabelEncoder()
+            df_copy[col] = le.fit_transform(df_copy[col].astype(str))
+            classes[col] = le.classes_
+        return df_copy.drop(columns=[target_col]), df_copy[target_col], classes
+
+    def fit_model(self, df, target_col):
+        """Label-encode text columns and fit the sample RandomForest on an 80/20 split."""
+        X, y, _ = self.encode_features(df, target_col)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X_train, y_train)
+        return model, X_test, y_test
+
     def predict(self, df, target_col):
         try:
-            df_copy = df.copy()
-            for col in df_copy.select_dtypes(include=['object']).columns:
-                le = LabelEncoder()
-                df_copy[col] = le.fit_transform(df_copy[col].astype(str))
-            
-            X = df_copy.drop(columns=[target_col])
-            y = df_copy[target_col]
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            
-            model = RandomForestClassifier(n_estimators=100, random_state=42)
-            model.fit(X_train, y_train)
+            model, X_test, y_test = self.fit_model(df, target_col)
             accuracy = model.score(X_test, y_test)
             
             feature_importance = pd.DataFrame({
-                'Feature': X.columns,
+                'Feature': X_test.columns,
                 'Importance': model.feature_importances_
             }).sort_values(by='Importance', ascending=False)
             
             return {"Accuracy": accuracy, "Feature Importance": feature_importance}
+        except Exception as e:
+            st.error(f"Error during prediction: {e}", icon="❌")
+            return None
+
+    def counterfactual_test(self, df, target_col, sensitive_cols, batch_rows=50000, max_values=10):
+        """How much the sample model's predictions depend on each sensitive attribute itself.
+
+        Every row is re-scored with the attribute set to each other candidate value (the categories,
+        or bin medians for numeric columns with many values). Rows that agree on all other features
+        are scored once, through one reusable buffer a batch at a time; only the attribute column is
+        rewritten per variant, so the other encoded features are never duplicated. Returns a
+        per-group summary (share of rows whose predicted class changes under any counterfactual
+        value, mean and largest probability shift) and a per (from, to) value table.
+        """
+        try:
+            X, y, classes = self.encode_features(df, target_col)
+            X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+            model = RandomForestClassifier(n_estimators=100, random_state=42)
+            # Fitted on an array like the batches it scores, so sklearn has no feature names to check
+            model.fit(X_train.to_numpy(dtype=np.float32), y_train)
+            positive = list(model.classes_).index(1) if 1 in model.classes_ else len(model.classes_) - 1
+
+            # RandomForest scores float32; converting once lets every batch slice the same array
+            features = X.to_numpy(dtype=np.float32)
+            buffer = np.empty((min(batch_rows, len(features)), features.shape[1]), dtype=np.float32)
+            original = np.empty(len(features))
+            for start in range(0, len(features), batch_rows):
+                batch = features[start:start + batch_rows]
+                original[start:start + len(batch)] = model.predict_proba(batch)[:, positive]
+
+            summary_rows, transition_rows = [], []
+            for col in sensitive_cols:
+                j = X.columns.get_loc(col)
+                groups, values, labels = self._counterfactual_values(X[col], classes.get(col), max_values)
+                n_groups = len(values)
+                # Rows identical apart from the attribute get identical counterfactual scores
+                keys, _ = pd.factorize(pd.util.hash_pandas_object(X.drop(columns=[col]), index=False).to_numpy())
+                _, first = np.unique(keys, return_index=True)
+                scores = np.empty((len(first), n_groups))
+                for start in range(0, len(first), batch_rows):
+                    rows = first[start:start + batch_rows]
+                    block = buffer[:len(rows)]
+                    np.take(features, rows, axis=0, out=block)
+                    for v, value in enumerate(values):
+                        block[:, j] = value
+                        scores[start:start + len(rows), v] = model.predict_proba(block)[:, positive]
+
+                known = groups >= 0
+                sizes = np.bincount(groups[known], minlength=n_groups)
+                changed = np.zeros(len(features), dtype=bool)
+                shift_sum = np.zeros((n_groups, n_groups))
+                flips = np.zeros((n_groups, n_groups))
+                largest = np.zeros(n_groups)
+                for v in range(n_groups):
+                    shift = scores[keys, v] - original
+                    flipped = (original >= 0.5) != (scores[keys, v] >= 0.5)
+                    other = known & (groups != v)
+                    changed |= flipped & other
+                    shift_sum[:, v] = np.bincount(groups[other], weights=shift[other], minlength=n_groups)
+                    flips[:, v] = np.bincount(groups[other], weights=flipped[other], minlength=n_groups)
+                    np.maximum.at(largest, groups[other], np.abs(shift[other]))
+
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    changed_share = np.bincount(groups[known], weights=changed[known], minlength=n_groups) / sizes
+                    mean_shift = shift_sum.sum(axis=1) / (sizes * max(n_groups - 1, 1))
+                for g, label in enumerate(labels):
+                    summary_rows.append({
+                        'Sensitive Column': col,
+                        'Group': label,
+                        'Rows': int(sizes[g]),
+                        'Changed Predictions (%)': round(changed_share[g] * 100, 2),
+                        'Mean Probability Shift': round(mean_shift[g], 4),
+                        'Max Probability Shift': round(largest[g], 4)
+                    })
+                    for v, to_label in enumerate(labels):
+                        if v != g and sizes[g]:
+                            transition_rows.append({
+                                'Sensitive Column': col,
+                                'From': label,
+                                'To': to_label,
+                                'Changed Predictions (%)': round(flips[g, v] / sizes[g] * 100, 2),
+                                'Mean Probability Shift': round(shift_sum[g, v] / sizes[g], 4)
+                            })
+            return pd.DataFrame(summary_rows), pd.DataFrame(transition_rows)
+        except Exception as e:
+            st.error(f"Error during counterfactual test: {e}", icon="❌")
+            return None, None
+
+    def _counterfactual_values(self, encoded, classes, max_values):
+        """Group code of every row, the encoded value substituted for each group and the group labels."""
+        if classes is not None or encoded.nunique() <= max_values:
+            codes, uniques = pd.factorize(encoded, sort=True)
+            labels = [str(classes[int(u)]) if classes is not None else str(u) for u in uniques]
+            return codes, np.asarray(uniques, dtype=np.float32), labels
+        bins = pd.qcut(encoded, q=max_values, duplicates='drop')
+        codes = bins.cat.codes.to_numpy()
+        medians = encoded.groupby(codes).median().reindex(range(len(bins.cat.categories)))
+        return codes, medians.to_numpy(dtype=np.float32), [str(interval) for interval in bins.cat.categories]
+
+    def predict_scores(self, df, target_col):
+        """Held-out positive-class probabilities from the sample model, indexed like ``df``."""
+        try:
+            model, X_test, _ = self.fit_model(df, target_col)
+            return pd.Series(model.predict_proba(X_test)[:, 1], index=X_test.index, name='Score')
         except Exception as e:
             st.error(f"Error during prediction: {e}", icon="❌")
             return None
\ No newline at end of file
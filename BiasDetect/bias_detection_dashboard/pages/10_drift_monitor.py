@@ -0,0 +1,59 @@
+import datetime
+
+import plotly.graph_objects as go
+import streamlit as st
+from drift_monitor import DriftMonitor
+from schema import get_schema
+from memory_governor import restore_session
+
+restore_session()
+
+st.markdown("<div class='card slide-in'><h3>Fairness Drift Monitor</h3></div>", unsafe_allow_html=True)
+st.markdown("Record each audited dataset version as a compact snapshot of per-group counts and compare it against the recent window of versions.")
+
+if st.session_state.get('df') is not None:
+    df = st.session_state.cleaned_df
+    binary_cols = get_schema(df).binary_targets()
+    if st.session_state.sensitive_cols and binary_cols:
+        window = st.number_input("Window size (versions)", min_value=1, max_value=60, value=6, help="New versions are compared against the pooled counts of this many previous versions.")
+        monitor = DriftMonitor(window=int(window))
+        target_col = st.selectbox("Outcome column", binary_cols, key="drift_target")
+        version = st.text_input("Version label", value=datetime.date.today().strftime("%Y-%m"), help="E.g. the month of the hiring data.")
+
+        if st.button("Record Snapshot"):
+            alerts = monitor.record(df, version, st.session_state.sensitive_cols, target_col)
+            if alerts.empty:
+                st.info(f"Snapshot '{version}' recorded. It is the first version in the window, so there is nothing to compare yet.", icon="ℹ️")
+            elif alerts['Flagged'].any():
+                flagged = alerts[alerts['Flagged']]
+                st.markdown(f"<div class='alert pulse'>⚠️ Significant changes in: {', '.join(sorted(set(flagged['Column'])))}</div>", unsafe_allow_html=True)
+                st.dataframe(alerts, use_container_width=True)
+            else:
+                st.success(f"Snapshot '{version}' recorded. No significant change against the window.", icon="✅")
+                st.dataframe(alerts, use_container_width=True)
+
+        st.markdown("<div class='section-title'>History</div>", unsafe_allow_html=True)
+        history_col = st.selectbox("Sensitive column", st.session_state.sensitive_cols, key="drift_history_col")
+        history = monitor.history(history_col, target_col)
+        if not history.empty:
+            st.caption(f"Current window: {', '.join(monitor.window_versions(history_col, target_col))}")
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=history['Version'], y=history['Disparate Impact'], mode='lines+markers', name='Disparate Impact', marker_color='#3B82F6'))
+            for col in [col for col in history.columns if col.startswith('Selection Rate (')]:
+                fig.add_trace(go.Scatter(x=history['Version'], y=history[col], mode='lines', name=col, line=dict(dash='dot')))
+            fig.add_hline(y=0.8, line_dash="dash", line_color="#EF4444", annotation_text="Fairness Threshold")
+            fig.update_layout(
+                title=f"Fairness Drift for {history_col}",
+                xaxis_title="Version",
+                yaxis_title="Value",
+                plot_bgcolor='white',
+                paper_bgcolor='white'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(history, use_container_width=True)
+        else:
+            st.info("No snapshots recorded yet for this column and outcome.", icon="ℹ️")
+    else:
+        st.warning("Drift monitoring needs at least one sensitive column and one binary (0 or 1) outcome column.", icon="⚠️")
+else:
+    st.info("Please upload a dataset in the 'Upload' page to monitor fairness drift.", icon="ℹ️")
\ No newline at end of file
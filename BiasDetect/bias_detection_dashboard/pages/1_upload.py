@@ -1,6 +1,15 @@
 import streamlit as st
 import pandas as pd
 from data_processor import DataProcessor
+from imputer import METHODS
+from excel_loader import ExcelLoader
+from dataset_store import dataset_store
+from pipeline import get_pipeline
+from sampling import StratifiedSampler, start_approximate_mode, stop_approximate_mode, sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
+
+# Reload this session's data if it was spilled to disk while idle
+restore_session()
 
 # Initialize session state
 if 'df' not in st.session_state:
@@ -29,11 +38,41 @@ uploaded_file = st.file_uploader("Choose a file", type=["csv", "xlsx"], help="Up
 
 if uploaded_file:
     try:
-        st.session_state.df = processor.load_data(uploaded_file)
+        loader = processor.load_data
+        variant = ''
+        if uploaded_file.name.endswith('.xlsx'):
+            # Pick sheets and columns before the workbook is parsed in full
+            excel_loader = ExcelLoader()
+            sheets = excel_loader.list_sheets(uploaded_file)
+            selected_sheets = st.multiselect("Sheets to load", sheets, default=sheets[:1], help="Rows from several sheets are stacked and tagged with a 'Sheet' column.")
+            header = excel_loader.read_header(uploaded_file, selected_sheets[0]) if selected_sheets else []
+            selected_columns = st.multiselect("Columns to load", header, default=header, help="Unselected columns are skipped while the workbook is streamed.")
+            progress_bar = st.progress(0.0, text="Reading workbook...")
+
+            def report_progress(sheet, rows_done, total_rows, rows_per_sec):
+                fraction = min(rows_done / total_rows, 1.0) if total_rows else 0.0
+                progress_bar.progress(fraction, text=f"Sheet '{sheet}': {rows_done:,} rows ({rows_per_sec:,.0f} rows/sec)")
+
+            def loader(file):
+                return processor.load_data(file, sheets=selected_sheets, columns=selected_columns, progress_callback=report_progress)
+            variant = repr((selected_sheets, selected_columns))
+
+        # Identical uploads from any session share one parsed, memory-mapped copy
+        st.session_state.df = dataset_store.load(uploaded_file, loader, variant)
         if st.session_state.df is not None:
-            st.session_state.cleaned_df = st.session_state.df.copy()
-            st.session_state.sensitive_cols = processor.detect_sensitive_columns(st.session_state.df)
-            
+            # Cleaning and profiling rerun only when the uploaded content changes
+            pipeline = get_pipeline()
+            source = st.session_state.df
+            sampler = StratifiedSampler()
+            if len(source) > sampler.max_rows and st.checkbox("Approximate mode", value=True, help=f"Explore a stratified sample of {sampler.max_rows:,} rows instantly while exact results on all rows are computed in the background."):
+                source = start_approximate_mode(source, sampler)
+            else:
+                stop_approximate_mode()
+            pipeline.set_source(source)
+            imputation = st.selectbox("Missing value imputation", list(METHODS), format_func=METHODS.get, help="Group-aware methods fill gaps from the candidate's own sensitive group, so filling does not erase group differences.")
+            results = pipeline.run(['clean', 'profile'], imputation=imputation)
+            sync_approximate_mode()
+
             st.success("Dataset uploaded successfully! 🎉", icon="✅")
             
             # Data Overview
@@ -54,7 +93,7 @@ if uploaded_file:
 
             # Data Cleaning
             st.markdown("<div class='card slide-in'><h3>Data Cleaning</h3></div>", unsafe_allow_html=True)
-            cleaning_issues = processor.clean_data(st.session_state.cleaned_df)
+            cleaning_issues = results['clean']['cleaning_issues']
             if cleaning_issues:
                 st.warning("Issues detected and fixed: " + "; ".join(cleaning_issues), icon="🛠️")
                 st.download_button(
@@ -67,6 +106,39 @@ if uploaded_file:
             else:
                 st.info("No cleaning required; dataset is clean.", icon="ℹ️")
 
+            # Near-duplicate applicants
+            st.markdown("<div class='card slide-in'><h3>Near-Duplicate Applicants</h3></div>", unsafe_allow_html=True)
+            with st.expander("Find applicants who applied several times with slightly different details"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    threshold = st.slider("Similarity threshold", 0.5, 1.0, 0.8, 0.05, help="Estimated Jaccard similarity of name, email and phone tokens needed to merge two rows.")
+                with col2:
+                    linked_threshold = st.slider("Threshold when email or phone match exactly", 0.0, 1.0, 0.4, 0.05, help="Lower bar for rows that share a normalised email or phone number.")
+                if st.button("Find Near-Duplicates"):
+                    st.session_state.near_duplicates = processor.find_near_duplicates(st.session_state.cleaned_df, threshold, linked_threshold)
+                rows, report, skipped = st.session_state.get('near_duplicates') or (None, None, 0)
+                if rows is not None and rows.index.equals(st.session_state.cleaned_df.index):
+                    if skipped:
+                        st.warning(f"{skipped:,} over-full buckets skipped: rows that only look alike through them were not compared.", icon="⚠️")
+                    if report.empty:
+                        st.info("No near-duplicate applicants found.", icon="ℹ️")
+                    else:
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.metric("Duplicate Clusters", len(report), help="Groups of rows that look like the same applicant.")
+                        with col2:
+                            st.metric("Rows to Merge", int(rows['Duplicate'].sum()), help="Rows dropped when each cluster is merged into its first row.")
+                        for col in st.session_state.sensitive_cols:
+                            impact = st.session_state.cleaned_df[col].astype(str).groupby(rows['Duplicate']).value_counts().unstack(0, fill_value=0)
+                            if True in impact.columns:
+                                st.markdown(f"**Duplicate rows by {col}**")
+                                st.write(pd.DataFrame({'Rows': impact.sum(axis=1), 'Duplicates': impact[True], 'Duplicate %': (impact[True] / impact.sum(axis=1) * 100).round(1)}))
+                        st.dataframe(report, use_container_width=True)
+                        if st.button("Merge Near-Duplicates"):
+                            get_pipeline().replace('clean', cleaned_df=processor.merge_near_duplicates(st.session_state.cleaned_df, rows))
+                            st.session_state.near_duplicates = None
+                            st.success("Near-duplicates merged. Downstream analyses will be recomputed on the merged data.", icon="✅")
+
             st.session_state.analysis_done = True
             st.markdown("<div class='success bounce'>Proceed to the next steps using the sidebar navigation! 🚀</div>", unsafe_allow_html=True)
         else:
@@ -74,4 +146,7 @@ if uploaded_file:
     except Exception as e:
         st.error(f"An error occurred during processing: {str(e)}. Please ensure the dataset is valid and try again.", icon="❌")
 else:
-    st.info("Please upload a dataset to start the analysis.", icon="ℹ️")
\ No newline at end of file
+    dataset_store.release()
+    st.info("Please upload a dataset to start the analysis.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
@@ -6,17 +6,24 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import networkx as nx
 from visualizer import Visualizer
+from schema import get_schema
+from sampling import sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
 
 visualizer = Visualizer()
 
+restore_session()
+
 st.markdown("<div class='card slide-in'><h3>Visualizations</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 if st.session_state.df is not None:
     st.markdown("<div class='section-title'>Explore Your Data</div>", unsafe_allow_html=True)
     
     # Filter for numerical and categorical columns
-    num_cols = st.session_state.cleaned_df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    cat_cols = st.session_state.cleaned_df.select_dtypes(include=['object']).columns.tolist()
+    schema = get_schema(st.session_state.cleaned_df)
+    num_cols = schema.numeric_columns()
+    cat_cols = schema.text_columns()
 
     # Tabs for different types of visualizations
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Distributions", "Relationships", "Box Plots", "Violin Plots", "Data Flow"])
@@ -25,7 +32,7 @@ if st.session_state.df is not None:
         st.markdown("<div class='section-title'>Distributions</div>", unsafe_allow_html=True)
         col_to_plot = st.selectbox("Select a column to plot distribution", num_cols + cat_cols, key="dist_col")
         if col_to_plot:
-            if st.session_state.cleaned_df[col_to_plot].dtype in ['int64', 'float64']:
+            if col_to_plot in num_cols:
                 fig = px.histogram(st.session_state.cleaned_df, x=col_to_plot, title=f"Histogram of {col_to_plot}", nbins=30, color_discrete_sequence=['#3B82F6'])
                 fig.update_traces(marker=dict(line=dict(width=1, color='DarkSlateGrey')))
             else:
@@ -67,4 +74,6 @@ if st.session_state.df is not None:
         st.markdown("<div class='section-title'>Data Flow Diagram</div>", unsafe_allow_html=True)
         visualizer.plot_data_flow(st.session_state.cleaned_df)
 else:
-    st.info("Please upload a dataset in the 'Upload' page to view visualizations.", icon="ℹ️")
\ No newline at end of file
+    st.info("Please upload a dataset in the 'Upload' page to view visualizations.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
@@ -1,69 +1,135 @@
 import streamlit as st
-import plotly.graph_objects as go
 from bias_analyzer import BiasAnalyzer
 from visualizer import Visualizer
+from schema import get_schema
+from ml_predictor import MLPredictor
+from pdf_generator import PDFGenerator
+from proxy_leakage import ProxyLeakageAnalyzer
+from pipeline import get_pipeline
+from sampling import StratifiedSampler, approximate_state, sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
 
 analyzer = BiasAnalyzer()
 visualizer = Visualizer()
+sampler = StratifiedSampler()
+
+restore_session()
 
 st.markdown("<div class='card slide-in'><h3>Bias & Fairness Analysis</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 if st.session_state.df is not None:
     if st.session_state.sensitive_cols:
-        binary_cols = [col for col in st.session_state.cleaned_df.columns if analyzer.is_binary(st.session_state.cleaned_df[col])]
+        # Binary target detection is part of the cached profile stage, so it runs once per dataset
+        binary_cols = get_pipeline().run(['profile'])['profile']['binary_cols']
         if binary_cols:
             target_col = st.selectbox("Select target column for bias analysis (must be binary: 0 or 1)", binary_cols, help="Choose the column representing the outcome (e.g., shortlisted).")
             
-            # Calculate fairness metrics and bias percentage
-            fairness_metrics = {}
-            bias_scores = []
+            # Fairness metrics and bias percentage are recomputed only when the data or target changes
+            fairness_metrics = get_pipeline().run(['fairness'], target_col=target_col)['fairness']['fairness_metrics']
+            approximate = approximate_state()
             for col in st.session_state.sensitive_cols:
-                metrics = analyzer.calculate_fairness_metrics(st.session_state.cleaned_df, col, target_col)
-                fairness_metrics[col] = metrics
+                metrics = fairness_metrics.get(col, {})
                 st.markdown(f"<div class='metric-card'>{col} Fairness Metrics</div>", unsafe_allow_html=True)
                 st.write(metrics)
+                if approximate:
+                    bounds = sampler.fairness_bounds(st.session_state.cleaned_df, col, target_col, approximate['rows'])
+                    if bounds:
+                        low, high = bounds['Disparate Impact']
+                        st.caption(f"Sample estimate: Disparate Impact lies between {low:.3f} and {high:.3f} with 95% confidence.")
                 visualizer.plot_fairness_metrics(metrics, col)
-                
-                # Calculate bias percentage based on disparate impact
-                if metrics and 'Disparate Impact' in metrics:
-                    di = metrics['Disparate Impact']
-                    bias_score = abs(1 - di) * 100  # Bias percentage: deviation from 1 (perfect fairness)
-                    bias_scores.append(bias_score)
-
-            st.session_state.fairness_metrics = fairness_metrics
-            st.session_state.bias_percentage = sum(bias_scores) / len(bias_scores) if bias_scores else 0
 
             # Display overall bias percentage
             st.markdown("<div class='section-title'>Overall Bias in Dataset</div>", unsafe_allow_html=True)
             st.metric("Bias Percentage", f"{st.session_state.bias_percentage:.2f}%", help="Average bias across sensitive features, calculated as the deviation of Disparate Impact from 1.")
 
+            # Every binary target against every sensitive column, from one cached pass over the data
+            st.markdown("<div class='section-title'>Fairness Matrix</div>", unsafe_allow_html=True)
+            with st.expander("How fair is every binary outcome across every sensitive column?"):
+                if st.button("Compute Fairness Matrix"):
+                    matrix = get_pipeline().run(['fairness_matrix'])['fairness_matrix']['fairness_matrix']
+                    if not matrix.empty:
+                        flagged = matrix[matrix['Below Threshold']]
+                        if not flagged.empty:
+                            st.markdown(f"<div class='alert pulse'>⚠️ {len(flagged)} of {len(matrix)} target and sensitive column pairs have Disparate Impact below 0.8.</div>", unsafe_allow_html=True)
+                        visualizer.plot_fairness_matrix(matrix, 'Disparate Impact')
+                        visualizer.plot_fairness_matrix(matrix, 'Equalized Odds')
+                        st.dataframe(matrix.astype({'Selection Rate by Group': str}), use_container_width=True)
+
             # Comparative Fairness Plot
             if len(fairness_metrics) > 1:
                 st.markdown("<div class='section-title'>Comparative Fairness Metrics</div>", unsafe_allow_html=True)
-                fig = go.Figure()
-                for col, metrics in fairness_metrics.items():
-                    if 'Selection Rate by Group' in metrics and 'selection_rate' in metrics['Selection Rate by Group']:
-                        selection_rates = metrics['Selection Rate by Group']['selection_rate']
-                        fig.add_trace(go.Bar(
-                            x=list(selection_rates.values()),
-                            y=list(selection_rates.keys()),
-                            name=col,
-                            orientation='h',
-                            marker_color='#3B82F6' if col == st.session_state.sensitive_cols[0] else '#10B981'
-                        ))
-                fig.add_vline(x=0.8, line_dash="dash", line_color="#EF4444", annotation_text="Fairness Threshold")
-                fig.update_layout(
-                    title="Comparative Selection Rates Across Sensitive Features",
-                    xaxis_title="Selection Rate",
-                    yaxis_title="Groups",
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    barmode='group'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                visualizer.plot_comparative_fairness(fairness_metrics, st.session_state.sensitive_cols)
+
+            # Binning sensitivity for continuous sensitive columns
+            continuous_cols = [col for col in st.session_state.sensitive_cols if col in get_schema(st.session_state.cleaned_df).numeric_columns()]
+            if continuous_cols:
+                st.markdown("<div class='section-title'>Binning Sensitivity</div>", unsafe_allow_html=True)
+                with st.expander("How stable is Disparate Impact across binning schemes?"):
+                    sweep_col = st.selectbox("Continuous sensitive column", continuous_cols, key="sweep_col")
+                    strategies = st.multiselect("Binning strategies", ['equal_width', 'quantile'], default=['equal_width', 'quantile'], key="sweep_strategies")
+                    min_bins, max_bins = st.slider("Number of bins", 2, 50, (2, 20), key="sweep_bins")
+                    edges_text = st.text_input("Custom bin edges (comma-separated, e.g. 18, 30, 45, 65)", key="sweep_edges")
+                    try:
+                        custom_edges = [[float(edge) for edge in edges_text.split(',') if edge.strip()]] if edges_text.strip() else None
+                    except ValueError:
+                        st.warning("Custom bin edges must be numbers separated by commas.", icon="⚠️")
+                        custom_edges = None
+                    sweep = analyzer.binning_sweep(st.session_state.cleaned_df, sweep_col, target_col, range(min_bins, max_bins + 1), strategies, custom_edges)
+                    if not sweep.empty:
+                        di = sweep['Disparate Impact'].dropna()
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("DI Range", f"{di.min():.2f} – {di.max():.2f}", help="Lowest and highest Disparate Impact over all schemes.")
+                        with col2:
+                            st.metric("DI Std. Dev.", f"{di.std():.3f}", help="Spread of Disparate Impact across schemes.")
+                        with col3:
+                            st.metric("Schemes Below 0.8", f"{(di < 0.8).mean() * 100:.0f}%", help="Share of schemes that would flag the column as biased.")
+                        visualizer.plot_binning_sweep(sweep, sweep_col)
+                        st.dataframe(sweep, use_container_width=True)
+
+            # Proxy leakage: can the other features jointly reconstruct each sensitive column?
+            st.markdown("<div class='section-title'>Proxy Leakage</div>", unsafe_allow_html=True)
+            with st.expander("Can the remaining features reveal the sensitive columns?"):
+                st.markdown("A classifier is trained to predict each sensitive column from the other features. An AUC near 0.5 means no leakage; close to 1.0 means the features jointly act as a proxy.")
+                if st.button("Run Proxy Leakage Check"):
+                    exclude = [target_col] + list(st.session_state.get('pii_columns') or [])
+                    leakage, attribution = ProxyLeakageAnalyzer().analyze(st.session_state.cleaned_df, st.session_state.sensitive_cols, exclude)
+                    if not leakage.empty:
+                        leaking = leakage[leakage['Leakage AUC'] >= 0.7]
+                        if not leaking.empty:
+                            st.markdown(f"<div class='alert pulse'>⚠️ Strong proxies found for: {', '.join(leaking['Sensitive Column'])}</div>", unsafe_allow_html=True)
+                        st.dataframe(leakage, use_container_width=True)
+                        visualizer.plot_proxy_attribution(attribution)
+                    else:
+                        st.info("No sensitive column had enough groups and features to model.", icon="ℹ️")
+
+            # Threshold sweep over a score column, the rule-based candidate score or a model's probabilities
+            st.markdown("<div class='section-title'>Threshold Sweep</div>", unsafe_allow_html=True)
+            with st.expander("How do fairness and accuracy move with the decision cutoff?"):
+                df = st.session_state.cleaned_df
+                score_options = ["Model probability (sample RandomForest)"]
+                if {'YearsExperience', 'EducationLevel', 'University', 'GapYears'}.issubset(df.columns):
+                    score_options.append("Rule-based candidate score")
+                score_options += [col for col in get_schema(df).numeric_columns() if col not in binary_cols]
+                score_source = st.selectbox("Score", score_options, key="threshold_score", help=f"Candidates with score >= threshold are selected; '{target_col}' is the true outcome.")
+                threshold_col = st.selectbox("Sensitive column", st.session_state.sensitive_cols, key="threshold_sensitive")
+                if st.button("Run Threshold Sweep"):
+                    if score_source == "Model probability (sample RandomForest)":
+                        scores = MLPredictor().predict_scores(df, target_col)
+                    elif score_source == "Rule-based candidate score":
+                        scores = PDFGenerator().compute_scores(df)
+                    else:
+                        scores = df[score_source]
+                    if scores is not None:
+                        threshold_sweep = analyzer.threshold_sweep(scores, df.loc[scores.index, target_col], df.loc[scores.index, threshold_col])
+                        visualizer.plot_threshold_curves(threshold_sweep, threshold_col)
+                        st.dataframe(threshold_sweep, use_container_width=True)
         else:
             st.warning("No binary columns (0 or 1) detected for bias analysis. Please ensure your dataset includes a binary target column.", icon="⚠️")
     else:
         st.warning("No sensitive columns detected for bias analysis.", icon="⚠️")
 else:
-    st.info("Please upload a dataset in the 'Upload' page to perform bias analysis.", icon="ℹ️")
\ No newline at end of file
+    st.info("Please upload a dataset in the 'Upload' page to perform bias analysis.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
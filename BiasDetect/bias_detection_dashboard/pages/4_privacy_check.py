@@ -1,13 +1,20 @@
 import streamlit as st
 from privacy_checker import PrivacyChecker
+from anonymizer import Anonymizer, METHODS
+from pipeline import get_pipeline
+from sampling import sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
 
 checker = PrivacyChecker()
 
+restore_session()
+
 st.markdown("<div class='card slide-in'><h3>Privacy Check</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 if st.session_state.df is not None:
     st.markdown("<div class='section-title'>Detect Personally Identifiable Information (PII)</div>", unsafe_allow_html=True)
-    st.session_state.pii_columns = checker.detect_pii(st.session_state.cleaned_df)
+    get_pipeline().run(['pii'])
     if st.session_state.pii_columns:
         st.markdown(f"<div class='alert pulse'>⚠️ Potential PII detected in columns: {', '.join(st.session_state.pii_columns)}</div>", unsafe_allow_html=True)
         with st.expander("What is PII and why remove it?"):
@@ -15,7 +22,60 @@ if st.session_state.df is not None:
             **Personally Identifiable Information (PII)** includes data that can identify individuals, such as names, emails, and phone numbers.
             Removing PII is crucial to protect user privacy and comply with data protection regulations like GDPR.
             """)
+
+        st.markdown("<div class='section-title'>Anonymize PII</div>", unsafe_allow_html=True)
+        anonymizer = Anonymizer()
+        default_plan = anonymizer.default_plan(st.session_state.pii_columns)
+        plan = {}
+        for col in st.session_state.pii_columns:
+            plan[col] = st.selectbox(f"Method for '{col}'", METHODS, index=METHODS.index(default_plan[col]), key=f"anonymize_{col}", help="hash: keyed pseudonym, mask: hide all but a hint, generalize: coarsen, drop: remove the column.")
+        if st.button("Anonymize Working Dataset"):
+            anonymized = anonymizer.transform(st.session_state.cleaned_df, plan)
+            if anonymized is not None:
+                get_pipeline().replace('clean', cleaned_df=anonymized)
+                st.success("PII columns anonymized in the working dataset. Later pages and the report use the anonymized values.", icon="✅")
+                st.download_button(
+                    label="Download Anonymized CSV",
+                    data=anonymized.to_csv(index=False),
+                    file_name="anonymized_dataset.csv",
+                    mime="text/csv"
+                )
+        st.caption("For multi-GB exports, run `python anonymizer.py export.csv scrubbed.parquet` to stream the file through a worker pool.")
     else:
         st.success("No PII detected! ✅", icon="✅")
+
+    st.markdown("<div class='section-title'>Re-identification Risk (k-Anonymity)</div>", unsafe_allow_html=True)
+    with st.expander("What is k-anonymity?"):
+        st.markdown("""
+        Even without names or emails, a combination of ordinary attributes (e.g. age band, gender and department) can single out a person.
+        A dataset is **k-anonymous** for a set of columns when every combination of their values is shared by at least *k* rows.
+        Continuous columns are grouped into quantile bands before counting.
+        """)
+    df = st.session_state.cleaned_df
+    candidates = checker.quasi_identifier_columns(df, exclude=st.session_state.pii_columns)
+    quasi_identifiers = st.multiselect("Quasi-identifier columns", candidates, default=candidates, help="Columns an outsider could know or link from other sources.")
+    col1, col2 = st.columns(2)
+    with col1:
+        k = st.slider("Required k", 2, 20, 5)
+    with col2:
+        max_size = st.slider("Largest combination to check", 1, 6, 3)
+    if st.button("Run k-Anonymity Analysis") and quasi_identifiers:
+        report, at_risk = checker.k_anonymity(df, quasi_identifiers, k=k, max_size=max_size)
+        if not report.empty:
+            violations = report[~report['k-Anonymous']]
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Rows at Risk", f"{at_risk * 100:.1f}%", help=f"Rows in a group smaller than {k} for at least one checked combination.")
+            with col2:
+                st.metric("Risky Combinations", len(violations), help="Smallest combinations that break k-anonymity; larger combinations containing them are not expanded.")
+            if not violations.empty:
+                st.markdown(f"<div class='alert pulse'>⚠️ {len(violations)} column combinations are not {k}-anonymous. Generalize, suppress or drop one of their columns before sharing.</div>", unsafe_allow_html=True)
+                st.dataframe(violations.sort_values(['Size', 'Rows Below k (%)'], ascending=[True, False]), use_container_width=True)
+            else:
+                st.success(f"All checked combinations are {k}-anonymous.", icon="✅")
+            with st.expander("All evaluated combinations"):
+                st.dataframe(report, use_container_width=True)
 else:
-    st.info("Please upload a dataset in the 'Upload' page to perform a privacy check.", icon="ℹ️")
\ No newline at end of file
+    st.info("Please upload a dataset in the 'Upload' page to perform a privacy check.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
@@ -1,10 +1,18 @@
 import streamlit as st
 import pandas as pd  # Added missing import
 from visualizer import Visualizer
+from stats_engine import StatsEngine
+from sampling import StratifiedSampler, approximate_state, sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
 
 visualizer = Visualizer()
+engine = StatsEngine()
+sampler = StratifiedSampler()
+
+restore_session()
 
 st.markdown("<div class='card slide-in'><h3>Statistical Analysis</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 if st.session_state.df is not None:
     st.markdown("<div class='section-title'>Statistical Insights</div>", unsafe_allow_html=True)
@@ -14,15 +22,20 @@ if st.session_state.df is not None:
 
     # Statistical Summary
     st.markdown("<div class='section-title'>Statistical Summary</div>", unsafe_allow_html=True)
-    stats = st.session_state.cleaned_df.describe().T
-    st.write(stats)
+    # One pass over the data yields the summary, skewness and kurtosis; repeat visits hit the cache
+    summary = engine.summarize(st.session_state.cleaned_df).copy()
+    approximate = approximate_state()
+    if approximate and not summary.empty:
+        summary.insert(summary.columns.get_loc('mean') + 1, 'mean ± (95%)', sampler.summary_bounds(summary, approximate['rows']))
+        st.caption("Computed on a stratified sample; 'mean ± (95%)' is the margin of error of each mean.")
+    st.write(summary.drop(columns=['skewness', 'kurtosis'], errors='ignore'))
 
     # Additional Statistics
     st.markdown("<div class='section-title'>Additional Statistics</div>", unsafe_allow_html=True)
     with st.expander("Skewness and Kurtosis"):
-        skewness = st.session_state.cleaned_df.select_dtypes(include=['int64', 'float64']).skew()
-        kurtosis = st.session_state.cleaned_df.select_dtypes(include=['int64', 'float64']).kurtosis()
-        stats_df = pd.DataFrame({'Skewness': skewness, 'Kurtosis': kurtosis})
+        stats_df = pd.DataFrame({'Skewness': summary.get('skewness'), 'Kurtosis': summary.get('kurtosis')})
         st.write(stats_df)
 else:
-    st.info("Please upload a dataset in the 'Upload' page to view statistical analysis.", icon="ℹ️")
\ No newline at end of file
+    st.info("Please upload a dataset in the 'Upload' page to view statistical analysis.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
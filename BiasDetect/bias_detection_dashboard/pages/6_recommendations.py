@@ -1,9 +1,18 @@
 import streamlit as st
 from bias_analyzer import BiasAnalyzer
+from mitigation import DEFAULT_BOUNDS, MitigationComparer
+from visualizer import Visualizer
+from pipeline import get_pipeline
+from sampling import sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
 
 analyzer = BiasAnalyzer()
+visualizer = Visualizer()
+
+restore_session()
 
 st.markdown("<div class='card slide-in'><h3>Recommendations & Bias Mitigation</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 if st.session_state.df is not None:
     st.markdown("<div class='section-title'>Actionable Recommendations</div>", unsafe_allow_html=True)
@@ -13,8 +22,9 @@ if st.session_state.df is not None:
 
     # Bias Mitigation
     if st.button("Apply Advanced Bias Mitigation", help="Apply reweighting to reduce bias in the dataset."):
-        st.session_state.cleaned_df = analyzer.mitigate_bias(st.session_state.cleaned_df, st.session_state.sensitive_cols)
-        st.success("Bias mitigation applied! Download the mitigated dataset below.", icon="✅")
+        # Replacing the cleaned data marks fairness, readiness and the report as stale
+        get_pipeline().replace('clean', cleaned_df=analyzer.mitigate_bias(st.session_state.cleaned_df, st.session_state.sensitive_cols))
+        st.success("Bias mitigation applied! Fairness metrics and ML readiness will be recomputed. Download the mitigated dataset below.", icon="✅")
         st.download_button(
             label="Download Mitigated Dataset",
             data=st.session_state.cleaned_df.to_csv(index=False),
@@ -22,5 +32,33 @@ if st.session_state.df is not None:
             mime="text/csv",
             help="Download the dataset after applying bias mitigation techniques."
         )
+
+    # Compare in-processing and post-processing mitigations against the baseline model
+    st.markdown("<div class='section-title'>Compare Mitigation Strategies</div>", unsafe_allow_html=True)
+    with st.expander("How much accuracy does each mitigation cost?"):
+        st.markdown("Trains the RandomForest baseline, threshold-optimised versions of it and fairness-constrained models over a grid of constraint bounds, then shows which ones are Pareto optimal in accuracy and Disparate Impact.")
+        binary_cols = get_pipeline().run(['profile'])['profile']['binary_cols']
+        if st.session_state.sensitive_cols and binary_cols:
+            col1, col2 = st.columns(2)
+            with col1:
+                mitigation_target = st.selectbox("Target column", binary_cols, key="mitigation_target")
+            with col2:
+                mitigation_sensitive = st.selectbox("Sensitive column", st.session_state.sensitive_cols, key="mitigation_sensitive")
+            bounds = st.multiselect("Constraint bounds (max. difference between groups)", [0.3, 0.2, 0.1, 0.05, 0.02, 0.01, 0.005], default=DEFAULT_BOUNDS, help="Stricter bounds are tried only while they keep improving fairness at an acceptable accuracy cost.")
+            if st.button("Compare Mitigation Strategies"):
+                progress_bar = st.progress(0.0, text="Training candidates...")
+
+                def report_progress(done, total):
+                    progress_bar.progress(done / total if total else 1.0, text=f"{done} of up to {total} candidates trained")
+
+                comparison = MitigationComparer(bounds=bounds).compare(st.session_state.cleaned_df, mitigation_target, mitigation_sensitive, report_progress)
+                progress_bar.progress(1.0, text="Done")
+                if not comparison.empty:
+                    visualizer.plot_pareto_frontier(comparison)
+                    st.dataframe(comparison, use_container_width=True)
+        else:
+            st.warning("A sensitive column and a binary target column are needed to compare mitigation strategies.", icon="⚠️")
 else:
-    st.info("Please upload a dataset in the 'Upload' page to view recommendations.", icon="ℹ️")
\ No newline at end of file
+    st.info("Please upload a dataset in the 'Upload' page to view recommendations.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
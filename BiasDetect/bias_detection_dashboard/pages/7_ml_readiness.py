@@ -1,37 +1,25 @@
 import streamlit as st
-import plotly.graph_objects as go
 from ml_predictor import MLPredictor
+from visualizer import Visualizer
+from pipeline import get_pipeline
+from sampling import sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
 
 predictor = MLPredictor()
+visualizer = Visualizer()
+
+restore_session()
 
 st.markdown("<div class='card slide-in'><h3>ML Readiness & Prediction</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 if st.session_state.df is not None:
     st.markdown("<div class='section-title'>Machine Learning Readiness</div>", unsafe_allow_html=True)
-    readiness, message, st.session_state.ml_score = predictor.check_ml_readiness(st.session_state.cleaned_df, st.session_state.sensitive_cols)
+    results = get_pipeline().run(['readiness'])['readiness']
+    readiness, message = results['ml_readiness'], results['ml_message']
     
     # ML Readiness Gauge
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=st.session_state.ml_score,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        title={'text': "ML Readiness Score (%)"},
-        gauge={
-            'axis': {'range': [0, 100]},
-            'bar': {'color': "#3B82F6"},
-            'steps': [
-                {'range': [0, 50], 'color': "#EF4444"},
-                {'range': [50, 75], 'color': "#F59E0B"},
-                {'range': [75, 100], 'color': "#10B981"}
-            ],
-            'threshold': {
-                'line': {'color': "black", 'width': 4},
-                'thickness': 0.75,
-                'value': 80
-            }
-        }
-    ))
-    st.plotly_chart(fig, use_container_width=True)
+    visualizer.plot_readiness_gauge(st.session_state.ml_score)
 
     if readiness:
         st.markdown("<div class='success bounce'>🎉 Congratulations! Dataset is Ready for ML Modeling!</div>", unsafe_allow_html=True)
@@ -42,7 +30,8 @@ if st.session_state.df is not None:
         st.image("assets/error.gif", width=200, caption="Fix required before modeling.")
 
     # Sample Prediction
-    binary_cols = [col for col in st.session_state.cleaned_df.columns if set(st.session_state.cleaned_df[col].dropna().unique()).issubset({0, 1})]
+    # Binary target detection is part of the cached profile stage, so it runs once per dataset
+    binary_cols = get_pipeline().run(['profile'])['profile']['binary_cols']
     if st.button("Run Sample Prediction", help="Train a simple ML model to predict the target variable."):
         if st.session_state.sensitive_cols and binary_cols:
             target_col = st.selectbox("Select target column for prediction", binary_cols, key="pred_target")
@@ -54,5 +43,28 @@ if st.session_state.df is not None:
                 st.error("Failed to generate predictions. Please check the dataset and target column.", icon="❌")
         else:
             st.warning("Select a binary target column for predictions.", icon="⚠️")
+
+    # Counterfactual test: does the model's output move when only the sensitive attribute changes?
+    st.markdown("<div class='section-title'>Counterfactual Fairness Test</div>", unsafe_allow_html=True)
+    with st.expander("Do predictions depend on the sensitive attributes themselves?"):
+        st.markdown("Every candidate is re-scored by the sample model with each sensitive attribute set to every other value, keeping all other features fixed. A fair model's predictions should not change.")
+        if st.session_state.sensitive_cols and binary_cols:
+            counterfactual_target = st.selectbox("Target column", binary_cols, key="counterfactual_target")
+            if st.button("Run Counterfactual Test"):
+                summary, transitions = predictor.counterfactual_test(st.session_state.cleaned_df, counterfactual_target, st.session_state.sensitive_cols)
+                if summary is not None:
+                    dependent = summary[summary['Changed Predictions (%)'] > 0]
+                    if not dependent.empty:
+                        st.markdown(f"<div class='alert pulse'>⚠️ Predictions depend directly on: {', '.join(dependent['Sensitive Column'].unique())}</div>", unsafe_allow_html=True)
+                    else:
+                        st.success("No prediction changes when only a sensitive attribute changes.", icon="✅")
+                    visualizer.plot_counterfactual_shift(summary)
+                    st.dataframe(summary, use_container_width=True)
+                    st.markdown("**By original and counterfactual value**")
+                    st.dataframe(transitions, use_container_width=True)
+        else:
+            st.warning("A sensitive column and a binary target column are needed for the counterfactual test.", icon="⚠️")
 else:
-    st.info("Please upload a dataset in the 'Upload' page to check ML readiness.", icon="ℹ️")
\ No newline at end of file
+    st.info("Please upload a dataset in the 'Upload' page to check ML readiness.", icon="ℹ️")
+
+refresh_approximate_mode()
\ No newline at end of file
@@ -1,7 +1,13 @@
 import streamlit as st
 from pdf_generator import generate_pdf_report
+from pipeline import get_pipeline
+from sampling import sync_approximate_mode, refresh_approximate_mode
+from memory_governor import restore_session
+
+restore_session()
 
 st.markdown("<div class='card slide-in'><h3>Generate Report</h3></div>", unsafe_allow_html=True)
+sync_approximate_mode()
 
 # Check if all required session state variables are present
 required_keys = ['df', 'cleaned_df', 'fairness_metrics', 'pii_columns', 'ml_score']
@@ -21,7 +27,12 @@ if missing_keys:
 else:
     if st.button("Generate Report"):
         try:
-            # Call generate_pdf_report without arguments
-            generate_pdf_report()
+            # The report always uses all rows, so wait for the exact results of approximate mode
+            sync_approximate_mode(wait=True)
+            # The report is rebuilt only if the data, PII or readiness results changed since the last one
+            results = get_pipeline().run(['report'])['report']
+            generate_pdf_report(results['report_pdf'], results['accepted_candidates'])
         except Exception as e:
-            st.error(f"Failed to generate PDF report: {str(e)}", icon="❌")
\ No newline at end of file
+            st.error(f"Failed to generate PDF report: {str(e)}", icon="❌")
+
+refresh_approximate_mode()
\ No newline at end of file
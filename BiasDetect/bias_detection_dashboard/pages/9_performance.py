@@ -0,0 +1,92 @@
+import streamlit as st
+import plotly.express as px
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from tracer import tracer
+from dataset_store import dataset_store
+from memory_governor import memory_governor, restore_session
+
+restore_session()
+
+st.markdown("<div class='card slide-in'><h3>Performance</h3></div>", unsafe_allow_html=True)
+st.markdown("Stage tracing records wall time, CPU time, peak memory and input size for every call into the analysis modules.")
+
+col1, col2 = st.columns(2)
+with col1:
+    enabled = st.checkbox("Enable stage tracing", value=tracer.enabled, help="Tracing is process-wide and costs nothing while disabled.")
+with col2:
+    track_memory = st.checkbox("Track peak memory", value=tracer.track_memory, help="Peak memory uses tracemalloc, which slows down allocation-heavy stages.")
+if enabled and (not tracer.enabled or track_memory != tracer.track_memory):
+    tracer.enable(track_memory)
+elif not enabled and tracer.enabled:
+    tracer.disable()
+
+ctx = get_script_run_ctx()
+scope = st.radio("Sessions", ["This session", "All sessions"], horizontal=True)
+session = ctx.session_id if scope == "This session" and ctx is not None else None
+
+records = tracer.to_frame(session)
+if not records.empty:
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Recorded Calls", len(records))
+    with col2:
+        st.metric("Total Wall Time (s)", f"{records.loc[records['depth'] == 0, 'wall_s'].sum():.2f}")
+    with col3:
+        st.metric("Sessions", records['session'].nunique())
+
+    st.markdown("<div class='section-title'>Per-Stage Timings</div>", unsafe_allow_html=True)
+    summary = tracer.summary(session)
+    st.dataframe(summary, use_container_width=True)
+    fig = px.bar(summary.reset_index(), x='total_wall_s', y='stage', orientation='h', title="Total Wall Time by Stage",
+                 color_discrete_sequence=['#3B82F6'])
+    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white', yaxis={'categoryorder': 'total ascending'})
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("<div class='section-title'>Per-Session Timings</div>", unsafe_allow_html=True)
+    per_session = records[records['depth'] == 0].groupby('session').agg(
+        calls=('wall_s', 'size'),
+        total_wall_s=('wall_s', 'sum'),
+        total_cpu_s=('cpu_s', 'sum'),
+        max_peak_mem_mb=('peak_mem_mb', 'max'),
+        max_input_rows=('input_rows', 'max')
+    ).sort_values(by='total_wall_s', ascending=False)
+    st.dataframe(per_session, use_container_width=True)
+
+    with st.expander("Raw Call Log"):
+        st.dataframe(records.sort_values(by='start', ascending=False), use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Download Chrome Trace", data=tracer.to_chrome_trace(session), file_name="stage_trace.json",
+                           mime="application/json", help="Open in chrome://tracing or ui.perfetto.dev.")
+    with col2:
+        st.download_button("Download JSON", data=tracer.to_json(session), file_name="stage_timings.json", mime="application/json")
+    with col3:
+        if st.button("Clear Recorded Calls"):
+            tracer.clear()
+            st.experimental_rerun()
+elif tracer.enabled:
+    st.info("Tracing is enabled. Run some analysis steps to record stage timings.", icon="ℹ️")
+else:
+    st.info("Enable stage tracing to start recording timings.", icon="ℹ️")
+
+st.markdown("<div class='section-title'>Shared Dataset Store</div>", unsafe_allow_html=True)
+store_stats = dataset_store.stats()
+if not store_stats.empty:
+    st.dataframe(store_stats, use_container_width=True)
+else:
+    st.info("No datasets are currently held in the shared store.", icon="ℹ️")
+
+st.markdown("<div class='section-title'>Session Memory</div>", unsafe_allow_html=True)
+session_stats = memory_governor.stats()
+if not session_stats.empty:
+    st.caption(f"Budget {memory_governor.budget_bytes / 1e6:,.0f} MB across all sessions; sessions idle for {memory_governor.idle_seconds // 60} minutes are spilled to {memory_governor.spill_dir}.")
+    st.dataframe(session_stats, use_container_width=True)
+else:
+    st.info("No browser sessions have been recorded yet.", icon="ℹ️")
+
+st.markdown("<div class='section-title'>Pipeline Stages</div>", unsafe_allow_html=True)
+if 'pipeline' in st.session_state:
+    st.dataframe(st.session_state.pipeline.status(), use_container_width=True)
+else:
+    st.info("Upload a dataset to start the analysis pipeline for this session.", icon="ℹ️")
\ No newline at end of file
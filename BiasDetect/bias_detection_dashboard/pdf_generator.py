@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import io
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from scipy.stats import chi2_contingency
@@ -10,7 +10,15 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import LabelEncoder
 import numpy as np
-
+from anonymizer import Anonymizer
+from figure_cache import figure_cache
+from proxy_leakage import ProxyLeakageAnalyzer
+from schema import get_schema
+from stats_engine import StatsEngine
+from tracer import traced
+from visualizer import Visualizer
+
+@traced
 class PDFGenerator:
     def __init__(self):
         self.df = st.session_state.get('cleaned_df')
@@ -39,8 +47,9 @@ class PDFGenerator:
         X = df_processed[feature_cols]
         return X
 
-    def generate_initial_labels(self, df):
-        """Generate initial shortlisting labels using the rule-based approach."""
+    def compute_scores(self, df):
+        """Rule-based candidate score in [0, 1] used to derive the initial shortlisting labels."""
+        df = df.copy()
         weights = {
             'YearsExperience': 0.4,
             'EducationLevel': 0.3,
@@ -50,8 +59,8 @@ class PDFGenerator:
 
         # Normalize features
         df['ExperienceScore'] = df['YearsExperience'] / df['YearsExperience'].max()
-        df['EducationScore'] = df['EducationLevel'].map({'Bachelor': 0.5, 'Master': 0.75, 'PhD': 1.0}).fillna(0.5)
-        df['UniversityScore'] = df['University'].map({'MIT': 1.0, 'Stanford': 1.0, 'Harvard': 0.9, 'Yale': 0.9, 'Berkeley': 0.8}).fillna(0.8)
+        df['EducationScore'] = df['EducationLevel'].map({'Bachelor': 0.5, 'Master': 0.75, 'PhD': 1.0}).astype(float).fillna(0.5)
+        df['UniversityScore'] = df['University'].map({'MIT': 1.0, 'Stanford': 1.0, 'Harvard': 0.9, 'Yale': 0.9, 'Berkeley': 0.8}).astype(float).fillna(0.8)
         df['GapPenalty'] = df['GapYears'].apply(lambda x: -0.1 * x if x > 0 else 0)
 
         # Calculate total score
@@ -61,14 +70,18 @@ class PDFGenerator:
             weights['University'] * df['UniversityScore'] +
             weights['GapYears'] * df['GapPenalty']
         )
-        df['Score'] = df['Score'].clip(0, 1)
+        return df['Score'].clip(0, 1)
+
+    def generate_initial_labels(self, df):
+        """Generate initial shortlisting labels using the rule-based approach."""
+        df['Score'] = self.compute_scores(df)
 
         # Shortlist candidates with scores above the median
         threshold = df['Score'].quantile(0.5)
         df['shortlisted'] = (df['Score'] >= threshold).astype(int)
 
         # Drop temporary columns
-        df = df.drop(columns=['ExperienceScore', 'EducationScore', 'UniversityScore', 'GapPenalty', 'Score'])
+        df = df.drop(columns=['Score'])
         return df
 
     def train_model(self, X, y):
@@ -118,10 +131,11 @@ class PDFGenerator:
 
     def check_feature_correlation(self, sensitive_col):
         correlations = []
+        text_cols = get_schema(self.df).text_columns()
         for col in self.df.columns:
             if col == sensitive_col or col in ['shortlisted', 'name', 'email', 'phone']:
                 continue
-            if self.df[col].dtype == 'object' or self.df[sensitive_col].dtype == 'object':
+            if col in text_cols or sensitive_col in text_cols:
                 contingency_table = pd.crosstab(self.df[sensitive_col], self.df[col])
                 chi2, p_value, _, _ = chi2_contingency(contingency_table)
                 if p_value < 0.05:
@@ -159,6 +173,11 @@ class PDFGenerator:
 
         return df_filtered
 
+    def chart(self, chart, params, build, width=432, height=243):
+        """A cached dashboard chart as a static image for the report, or None if it cannot be rendered."""
+        png = figure_cache.image(chart, params, build, width=width * 2, height=height * 2)
+        return Image(io.BytesIO(png), width=width, height=height) if png else None
+
     def generate_pdf(self):
         if not all([self.df is not None, self.pii_columns is not None, self.ml_score is not None]):
             st.error("Please complete all analysis steps before generating the report.", icon="❌")
@@ -188,6 +207,10 @@ class PDFGenerator:
         # Check for feature correlations with Gender
         correlated_features = self.check_feature_correlation('Gender')
 
+        # Check whether feature combinations jointly reveal the sensitive columns
+        sensitive_cols = st.session_state.get('sensitive_cols') or ['Gender']
+        leakage, _ = ProxyLeakageAnalyzer().analyze(self.df, sensitive_cols, ['shortlisted'] + list(self.pii_columns))
+
         # Calculate gender distribution and shortlisting percentages
         gender_dist = self.df['Gender'].value_counts(normalize=True) * 100
         shortlisted_dist = self.df[self.df['shortlisted'] == 1]['Gender'].value_counts(normalize=True) * 100
@@ -220,7 +243,7 @@ class PDFGenerator:
         elements.append(Spacer(1, 12))
 
         elements.append(Paragraph("Statistical Summary", styles['Heading3']))
-        stats = self.df.describe().T
+        stats = StatsEngine().describe(self.df)
         stats_data = [[''] + list(stats.columns)]
         for index, row in stats.iterrows():
             stats_data.append([index] + [f"{val:.2f}" for val in row])
@@ -292,6 +315,19 @@ class PDFGenerator:
             ]))
             elements.append(table)
             elements.append(Spacer(1, 12))
+            # Same cached figure as the bias analysis page, rendered once per chart
+            rates = metrics['Selection Rate by Group']
+            image = self.chart('fairness_metrics', (sensitive_col, list(rates.items())), lambda: Visualizer().fairness_metrics_figure(rates, sensitive_col))
+            if image is not None:
+                elements.append(image)
+                elements.append(Spacer(1, 12))
+
+        score = round(float(self.ml_score), 2)
+        image = self.chart('readiness_gauge', score, lambda: Visualizer().readiness_gauge_figure(score))
+        if image is not None:
+            elements.append(Paragraph("ML Readiness", styles['Heading3']))
+            elements.append(image)
+            elements.append(Spacer(1, 12))
 
         # Step 4: Feature Contribution Check
         step += 1
@@ -306,6 +342,28 @@ class PDFGenerator:
             elements.append(Paragraph("No significant correlations with Gender detected.", styles['Normal']))
         elements.append(Spacer(1, 12))
 
+        elements.append(Paragraph("Proxy Leakage", styles['Heading3']))
+        if not leakage.empty:
+            elements.append(Paragraph("Cross-validated AUC of predicting each sensitive column from all other features (0.5 = no leakage, 1.0 = fully revealed):", styles['Normal']))
+            leakage_data = [['Sensitive Column', 'Leakage AUC', 'Top Proxies']]
+            for _, row in leakage.iterrows():
+                leakage_data.append([row['Sensitive Column'], f"{row['Leakage AUC']:.3f} ± {row['AUC Std']:.3f}", row['Top Proxies']])
+            table = Table(leakage_data)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            elements.append(table)
+            if (leakage['Leakage AUC'] >= 0.7).any():
+                elements.append(Paragraph("Recommendation: Sensitive columns with AUC >= 0.7 can be inferred from the listed features even if the columns themselves are removed.", styles['Normal']))
+        else:
+            elements.append(Paragraph("No sensitive column could be modelled for proxy leakage.", styles['Normal']))
+        elements.append(Spacer(1, 12))
+
         elements.append(Paragraph("Privacy Check", styles['Heading2']))
         if self.pii_columns:
             for col in self.pii_columns:
@@ -324,8 +382,8 @@ class PDFGenerator:
         elements.append(Spacer(1, 12))
 
         if 'name' in accepted_candidates.columns:
-            elements.append(Paragraph("Accepted Candidates:", styles['Heading3']))
-            accepted_names = accepted_candidates['name'].head(50).tolist()
+            elements.append(Paragraph("Accepted Candidates (pseudonymised):", styles['Heading3']))
+            accepted_names = Anonymizer().pseudonyms(accepted_candidates['name'].head(50)).tolist()
             if len(accepted_candidates) > 50:
                 accepted_names.append("... (and more)")
             names_text = ", ".join(accepted_names)
@@ -347,9 +405,10 @@ class PDFGenerator:
             st.error(f"Failed to generate PDF: {str(e)}", icon="❌")
             return None, None
 
-def generate_pdf_report():
-    pdf_gen = PDFGenerator()
-    pdf_data, accepted_candidates = pdf_gen.generate_pdf()
+def generate_pdf_report(pdf_data=None, accepted_candidates=None):
+    if pdf_data is None:
+        pdf_gen = PDFGenerator()
+        pdf_data, accepted_candidates = pdf_gen.generate_pdf()
 
     if pdf_data and accepted_candidates is not None:
         st.download_button(
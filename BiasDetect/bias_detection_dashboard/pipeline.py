@@ -0,0 +1,267 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from bias_analyzer import BiasAnalyzer
+from data_processor import DataProcessor
+from dataset_store import dataset_store, fingerprint
+from imputer import GLOBAL
+from ml_predictor import MLPredictor
+from pdf_generator import PDFGenerator
+from privacy_checker import PrivacyChecker
+from schema import get_schema
+from tracer import traced
+
+
+class Stage:
+    def __init__(self, name, func, deps=(), params=(), defaults=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.params = list(params)
+        self.defaults = dict(defaults or {})
+
+
+def _clean(inputs, params):
+    df = inputs['upload']['df']
+    cleaned_df = df.copy()
+    issues = DataProcessor().clean_data(cleaned_df, params['imputation'])
+    # Sessions cleaning the same upload the same way share one read-only copy
+    key = hashlib.sha256(repr(('clean', fingerprint(df), params['imputation'])).encode()).hexdigest()
+    return {'cleaned_df': dataset_store.put(key, cleaned_df, role='cleaned'), 'cleaning_issues': issues}
+
+
+def _profile(inputs, params):
+    df = inputs['clean']['cleaned_df']
+    return {
+        'sensitive_cols': DataProcessor().detect_sensitive_columns(df),
+        'binary_cols': get_schema(df).binary_targets()
+    }
+
+
+def _pii(inputs, params):
+    return {'pii_columns': PrivacyChecker().detect_pii(inputs['clean']['cleaned_df'])}
+
+
+def _fairness(inputs, params):
+    df = inputs['clean']['cleaned_df']
+    analyzer = BiasAnalyzer(report_errors=params['report_errors'])
+    fairness_metrics = {}
+    bias_scores = []
+    for col in inputs['profile']['sensitive_cols']:
+        metrics = analyzer.calculate_fairness_metrics(df, col, params['target_col'])
+        fairness_metrics[col] = metrics
+        if metrics and 'Disparate Impact' in metrics:
+            # Bias percentage: deviation of Disparate Impact from 1 (perfect fairness)
+            bias_scores.append(abs(1 - metrics['Disparate Impact']) * 100)
+    return {
+        'fairness_metrics': fairness_metrics,
+        'bias_percentage': sum(bias_scores) / len(bias_scores) if bias_scores else 0
+    }
+
+
+def _fairness_matrix(inputs, params):
+    df = inputs['clean']['cleaned_df']
+    return {'fairness_matrix': BiasAnalyzer(report_errors=params['report_errors']).fairness_matrix(df, inputs['profile']['binary_cols'], inputs['profile']['sensitive_cols'])}
+
+
+def _readiness(inputs, params):
+    readiness, message, score = MLPredictor().check_ml_readiness(inputs['clean']['cleaned_df'], inputs['profile']['sensitive_cols'])
+    return {'ml_readiness': readiness, 'ml_message': message, 'ml_score': score}
+
+
+def _report(inputs, params):
+    generator = PDFGenerator()
+    generator.df = inputs['clean']['cleaned_df']
+    generator.pii_columns = inputs['pii']['pii_columns']
+    generator.ml_score = inputs['readiness']['ml_score']
+    pdf_data, accepted_candidates = generator.generate_pdf()
+    return {'report_pdf': pdf_data, 'accepted_candidates': accepted_candidates}
+
+
+STAGES = [
+    Stage('upload', None),
+    Stage('clean', _clean, ['upload'], params=['imputation'], defaults={'imputation': GLOBAL}),
+    Stage('profile', _profile, ['clean']),
+    Stage('pii', _pii, ['clean']),
+    Stage('fairness', _fairness, ['clean', 'profile'], params=['target_col']),
+    Stage('fairness_matrix', _fairness_matrix, ['clean', 'profile']),
+    Stage('readiness', _readiness, ['clean', 'profile']),
+    Stage('report', _report, ['clean', 'profile', 'pii', 'readiness'])
+]
+
+
+@traced
+class Pipeline:
+    """The dashboard's analysis steps as a DAG of cached stages.
+
+    Every stage returns a dict of named outputs that is mirrored into ``st.session_state`` under the
+    same names, so pages keep reading ``cleaned_df``, ``pii_columns``, ``fairness_metrics`` and so on.
+    A stage's cache key is derived from its dependencies' keys and its declared parameters, so a
+    new upload, a changed parameter or a :meth:`replace` only re-executes the stages downstream of
+    the change. Stale stages at the same depth (e.g. PII and profile, fairness and readiness) run
+    concurrently in threads attached to the calling script run. With ``mirror=False`` (e.g. for a
+    background computation) outputs are kept in the pipeline only, and with ``report_errors=False``
+    stage errors are raised instead of being shown on the page.
+    """
+
+    def __init__(self, stages=None, mirror=True, report_errors=True):
+        self.stages = {stage.name: stage for stage in (stages or STAGES)}
+        self.mirror = mirror
+        self.report_errors = report_errors
+        self.params = {}
+        self._results = {}
+        self._overrides = {}
+        self._stats = {name: {'runs': 0, 'hits': 0, 'seconds': 0.0} for name in self.stages}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sessions can be spilled to disk by the memory governor; the lock is recreated on load
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def set_source(self, df):
+        """Feed a (new) uploaded dataset; stages recompute only if its content changed."""
+        key = fingerprint(df)
+        if self._results.get('upload', (None,))[0] != key:
+            self._results['upload'] = (key, {'df': df})
+        self._mirror(self._results['upload'][1])
+
+    def run(self, targets, **params):
+        """Bring ``targets`` and everything they depend on up to date and return their outputs."""
+        with self._lock:
+            if 'upload' not in self._results:
+                raise ValueError("No dataset has been uploaded yet.")
+            self.params.update(params)
+            keys = {'upload': self._results['upload'][0]}
+            for level in self._levels(self._required(targets)):
+                stale = []
+                for name in level:
+                    keys[name] = self._key(name, keys)
+                    if self._results.get(name, (None,))[0] == keys[name]:
+                        self._stats[name]['hits'] += 1
+                    else:
+                        stale.append(name)
+                if len(stale) > 1:
+                    ctx = get_script_run_ctx()
+                    with ThreadPoolExecutor(max_workers=len(stale), initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as pool:
+                        outputs = list(pool.map(self._execute, stale))
+                else:
+                    outputs = [self._execute(name) for name in stale]
+                for name, output in zip(stale, outputs):
+                    self._results[name] = (keys[name], output)
+                for name in level:
+                    self._mirror(self._results[name][1])
+            return {name: self._results[name][1] for name in targets}
+
+    def replace(self, stage, **outputs):
+        """Substitute some outputs of ``stage`` (e.g. a mitigated ``cleaned_df``) and invalidate everything downstream.
+
+        The substitution holds until the stage's own inputs change, e.g. when a different dataset is uploaded.
+        """
+        with self._lock:
+            key, value = self._results[stage]
+            base_key = self._overrides[stage]['base'] if stage in self._overrides else key
+            value = dict(value, **outputs)
+            content = [fingerprint(output) if isinstance(output, pd.DataFrame) else repr(output) for output in outputs.values()]
+            new_key = hashlib.sha256(repr((base_key, sorted(outputs), content)).encode()).hexdigest()
+            self._overrides[stage] = {'base': base_key, 'key': new_key, 'value': value}
+            self._results[stage] = (new_key, value)
+            self._mirror(value)
+
+    def adopt(self, other):
+        """Take over the cached results of another pipeline, e.g. one that ran on all rows in the background.
+
+        Results are matched by cache key, so they are used once :meth:`set_source` is given the same data.
+        """
+        with self._lock:
+            for name, result in other._results.items():
+                if name != 'upload' and name in self.stages:
+                    self._results[name] = result
+            self._results['upload'] = other._results['upload']
+
+    def status(self):
+        """Per-stage cache key, run and hit counts, for the performance page."""
+        rows = []
+        for name, stage in self.stages.items():
+            stats = self._stats[name]
+            rows.append({
+                'Stage': name,
+                'Depends On': ", ".join(stage.deps),
+                'Key': self._results[name][0][:12] if name in self._results else None,
+                'Replaced': name in self._overrides,
+                'Runs': stats['runs'],
+                'Cache Hits': stats['hits'],
+                'Last Run (s)': stats['seconds']
+            })
+        return pd.DataFrame(rows)
+
+    def _required(self, targets):
+        required = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in required:
+                required.add(name)
+                pending.extend(self.stages[name].deps)
+        return required
+
+    def _levels(self, required):
+        depth = {}
+        for name in self.stages:
+            if name in required:
+                depth[name] = max((depth[dep] + 1 for dep in self.stages[name].deps), default=0)
+        levels = {}
+        for name, level in depth.items():
+            levels.setdefault(level, []).append(name)
+        return [levels[level] for level in sorted(levels) if level > 0]
+
+    def _key(self, name, keys):
+        stage = self.stages[name]
+        missing = [param for param in stage.params if param not in self.params and param not in stage.defaults]
+        if missing:
+            raise ValueError(f"Stage '{name}' needs parameter(s): {', '.join(missing)}")
+        base_key = hashlib.sha256(repr((name, [keys[dep] for dep in stage.deps], list(self._params(stage).items()))).encode()).hexdigest()
+        override = self._overrides.get(name)
+        if override is not None:
+            if override['base'] == base_key:
+                return override['key']
+            del self._overrides[name]
+        return base_key
+
+    def _execute(self, name):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        inputs = {dep: self._results[dep][1] for dep in stage.deps}
+        # report_errors is not a stage parameter, so it does not change cache keys
+        output = stage.func(inputs, dict(self._params(stage), report_errors=self.report_errors))
+        self._stats[name]['runs'] += 1
+        self._stats[name]['seconds'] = time.perf_counter() - start
+        return output
+
+    def _params(self, stage):
+        return {param: self.params.get(param, stage.defaults.get(param)) for param in stage.params}
+
+    def _mirror(self, outputs):
+        if not self.mirror:
+            return
+        for key, value in outputs.items():
+            if key != 'df':
+                st.session_state[key] = value
+
+
+def get_pipeline():
+    """The pipeline of the current browser session."""
+    if 'pipeline' not in st.session_state:
+        st.session_state.pipeline = Pipeline()
+    return st.session_state.pipeline
\ No newline at end of file
@@ -1,6 +1,21 @@
 import pandas as pd
+import numpy as np
 import re
+import streamlit as st
+from schema import BINARY, CATEGORICAL, NUMERIC, get_schema
+from tracer import traced
 
+
+def _combine(codes_a, card_a, codes_b, card_b):
+    """Equivalence-class codes of two code arrays combined; re-densified by hashing when the product space gets large."""
+    codes = codes_a.astype(np.int64) * card_b + codes_b
+    card = card_a * card_b
+    if card > max(len(codes), 1 << 20):
+        codes, uniques = pd.factorize(codes)
+        card = len(uniques)
+    return codes, card
+
+@traced
 class PrivacyChecker:
     def detect_pii(self, df):
         pii_columns = []
@@ -10,9 +25,10 @@ class PrivacyChecker:
             'name': r'^(name|full_name|first_name|last_name)$'
         }
         
+        text_cols = get_schema(df).text_columns()
         for col in df.columns:
-            if df[col].dtype == 'object':
-                if any(pattern in col.lower() for pattern in pii_patterns['name'].split('|')):
+            if col in text_cols:
+                if re.match(pii_patterns['name'], col.lower()):
                     pii_columns.append(col)
                 elif df[col].str.contains(pii_patterns['email'], na=False).any():
                     pii_columns.append(col)
@@ -32,4 +48,88 @@ class PrivacyChecker:
                 recommendations.append(f"Column '{col}' contains names. Consider anonymizing or removing this column.")
             else:
                 recommendations.append(f"Column '{col}' may contain PII. Review and consider anonymizing or removing this column.")
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+    def quasi_identifier_columns(self, df, exclude=()):
+        """Group-like and numeric columns that could be combined to single people out; identifiers and free text are left out."""
+        return [col for col in get_schema(df).columns(NUMERIC, CATEGORICAL, BINARY) if col not in exclude]
+
+    def k_anonymity(self, df, quasi_identifiers, k=5, max_size=3, bins=5, max_combinations=20000):
+        """Equivalence-class sizes for combinations of quasi-identifiers, searched level by level.
+
+        Each column is encoded once as integer codes (continuous columns as ``bins`` quantile bands) and
+        a combination's classes are its parent's codes combined with one more column. Class sizes can only
+        shrink as columns are added, so a combination that already violates k-anonymity is reported but
+        not expanded, and a combination is only evaluated when all of its subsets are k-anonymous.
+        Returns the per-combination report and the share of rows that fall in a class smaller than ``k``.
+        """
+        try:
+            schema = get_schema(df)
+            n_rows = len(df)
+            codes, cards = {}, {}
+            for col in quasi_identifiers:
+                series = df[col]
+                if col in schema.numeric_columns() and series.nunique() > bins:
+                    series = pd.qcut(series, q=bins, duplicates='drop')
+                col_codes, uniques = pd.factorize(series, use_na_sentinel=False)
+                codes[col] = col_codes.astype(np.int32)
+                cards[col] = max(len(uniques), 1)
+
+            rows = []
+            at_risk = np.zeros(n_rows, dtype=bool)
+            buffer = np.empty(n_rows, dtype=np.int64)
+            evaluated = 0
+            candidates = [(col,) for col in sorted(codes)]
+            size = 1
+            while candidates and size <= max_size and evaluated < max_combinations:
+                safe = set()
+                prefix, prefix_codes, prefix_card = None, None, None
+                for combo in candidates:
+                    if evaluated >= max_combinations:
+                        break
+                    if combo[:-1] != prefix:
+                        # Candidates are sorted, so each prefix is folded together once per level
+                        prefix = combo[:-1]
+                        prefix_codes, prefix_card = (np.zeros(n_rows, dtype=np.int64), 1)
+                        for col in prefix:
+                            prefix_codes, prefix_card = _combine(prefix_codes, prefix_card, codes[col], cards[col])
+                    col = combo[-1]
+                    if prefix_card * cards[col] <= max(n_rows, 1 << 22):
+                        # Small product space: combine in place in a reused buffer and count directly
+                        np.multiply(codes[col], prefix_card, out=buffer, casting='unsafe')
+                        np.add(buffer, prefix_codes, out=buffer)
+                        combo_codes, combo_card = buffer, prefix_card * cards[col]
+                    else:
+                        combo_codes, combo_card = _combine(prefix_codes, prefix_card, codes[col], cards[col])
+                    counts = np.bincount(combo_codes, minlength=combo_card)
+                    sizes = counts[counts > 0]
+                    anonymous = len(sizes) == 0 or sizes.min() >= k
+                    if not anonymous:
+                        at_risk |= counts[combo_codes] < k
+                    else:
+                        safe.add(combo)
+                    evaluated += 1
+                    rows.append({
+                        'Columns': " + ".join(combo),
+                        'Size': size,
+                        'Classes': len(sizes),
+                        'Min k': int(sizes.min()) if len(sizes) else 0,
+                        'Unique Rows': int((sizes == 1).sum()),
+                        'Rows Below k (%)': sizes[sizes < k].sum() / n_rows * 100 if n_rows else 0.0,
+                        'k-Anonymous': anonymous
+                    })
+
+                # Apriori join: extend safe sets whose every same-size subset is also safe
+                size += 1
+                candidates = []
+                for combo in sorted(safe):
+                    for col in sorted(codes):
+                        if col <= combo[-1]:
+                            continue
+                        child = combo + (col,)
+                        if all(child[:i] + child[i + 1:] in safe for i in range(len(child) - 1)):
+                            candidates.append(child)
+            return pd.DataFrame(rows), float(at_risk.mean()) if n_rows else 0.0
+        except Exception as e:
+            st.error(f"Error analyzing k-anonymity: {str(e)}", icon="❌")
+            return pd.DataFrame(), 0.0
\ No newline at end of file
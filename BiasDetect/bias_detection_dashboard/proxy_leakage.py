@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from joblib import Parallel, delayed
+from sklearn.ensemble import ExtraTreesClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from bias_analyzer import BiasAnalyzer
+from dataset_store import fingerprint
+from schema import BINARY, CATEGORICAL, NUMERIC, get_schema
+from tracer import traced
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _fit_fold(X, y, train, test, n_classes, seed):
+    model = ExtraTreesClassifier(n_estimators=50, max_depth=10, min_samples_leaf=5, random_state=seed, n_jobs=1)
+    model.fit(X[train], y[train])
+    proba = model.predict_proba(X[test])
+    if n_classes == 2:
+        auc = roc_auc_score(y[test], proba[:, 1])
+    else:
+        auc = roc_auc_score(y[test], proba, multi_class='ovr', average='macro', labels=model.classes_)
+    return auc, model.feature_importances_
+
+
+@traced
+class ProxyLeakageAnalyzer:
+    """How well each sensitive attribute can be predicted from the other features combined.
+
+    A lightweight tree ensemble is cross-validated per attribute; all (attribute, fold) fits run in
+    parallel threads and results are cached per dataset fingerprint, so repeated reports are free.
+    An AUC near 0.5 means no leakage, near 1.0 means the features jointly reveal the attribute.
+    """
+
+    def __init__(self, n_folds=3, max_rows=20000, n_jobs=-1, cache_size=128):
+        self.n_folds = n_folds
+        self.max_rows = max_rows
+        self.n_jobs = n_jobs
+        self.cache_size = cache_size
+
+    def encode_features(self, df):
+        """Numeric columns as floats and group columns as integer codes; identifiers and free text are left out."""
+        schema = get_schema(df)
+        features = {}
+        for col in df.columns:
+            kind = schema.kind(col)
+            if kind == NUMERIC or (kind == BINARY and col in schema.numeric_columns()):
+                features[col] = df[col].astype(float).to_numpy()
+            elif kind in (CATEGORICAL, BINARY):
+                codes = pd.factorize(df[col])[0].astype(float)
+                codes[codes < 0] = np.nan
+                features[col] = codes
+        return features
+
+    def analyze(self, df, sensitive_cols, exclude=()):
+        """Return (summary, attribution): leakage AUC per attribute and mean feature importance per attribute."""
+        try:
+            key = (fingerprint(df), tuple(sensitive_cols), tuple(sorted(exclude)), self.n_folds, self.max_rows)
+            with _cache_lock:
+                if key in _cache:
+                    _cache.move_to_end(key)
+                    return _cache[key]
+
+            sample = df.sample(n=self.max_rows, random_state=42) if len(df) > self.max_rows else df
+            features = self.encode_features(sample)
+            analyzer = BiasAnalyzer()
+            tasks = []
+            meta = {}
+            for col in sensitive_cols:
+                names = [name for name in features if name != col and name not in exclude]
+                if not names:
+                    continue
+                target = analyzer.bin_continuous_column(sample[col]) if sample[col].nunique() > 10 else sample[col]
+                y, classes = pd.factorize(target)
+                # Rows with a missing attribute or a class too rare to stratify are left out
+                counts = np.bincount(y[y >= 0], minlength=len(classes))
+                keep = (y >= 0) & (counts[np.maximum(y, 0)] >= self.n_folds)
+                if len(np.unique(y[keep])) < 2:
+                    continue
+                X = np.column_stack([features[name] for name in names])[keep]
+                X = np.where(np.isnan(X), np.nanmedian(X, axis=0), X)
+                X = np.nan_to_num(X)
+                y = pd.factorize(y[keep])[0]
+                meta[col] = names
+                folds = StratifiedKFold(n_splits=self.n_folds, shuffle=True, random_state=42).split(X, y)
+                for fold, (train, test) in enumerate(folds):
+                    tasks.append((col, delayed(_fit_fold)(X, y, train, test, int(y.max()) + 1, fold)))
+
+            outputs = Parallel(n_jobs=self.n_jobs, prefer='threads')(task for _, task in tasks)
+            rows = []
+            attribution = {}
+            for col in meta:
+                results = [output for (task_col, _), output in zip(tasks, outputs) if task_col == col]
+                aucs = [auc for auc, _ in results]
+                importance = pd.Series(np.mean([imp for _, imp in results], axis=0), index=meta[col])
+                attribution[col] = importance
+                rows.append({
+                    'Sensitive Column': col,
+                    'Leakage AUC': float(np.mean(aucs)),
+                    'AUC Std': float(np.std(aucs)),
+                    'Top Proxies': ", ".join(importance.sort_values(ascending=False).index[:3])
+                })
+            result = (pd.DataFrame(rows), pd.DataFrame(attribution).fillna(0.0))
+            with _cache_lock:
+                _cache[key] = result
+                while len(_cache) > self.cache_size:
+                    _cache.popitem(last=False)
+            return result
+        except Exception as e:
+            st.error(f"Error analyzing proxy leakage: {str(e)}", icon="❌")
+            return pd.DataFrame(), pd.DataFrame()
\ No newline at end of file
@@ -0,0 +1,222 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.stats import norm
+
+from bias_analyzer import BiasAnalyzer
+from data_processor import DataProcessor
+from dataset_store import fingerprint
+from pipeline import Pipeline, get_pipeline
+from schema import get_schema
+from stats_engine import StatsEngine
+from tracer import traced
+
+# Stages the background worker brings up to date on all rows
+EXACT_STAGES = ['clean', 'profile', 'pii', 'readiness', 'fairness_matrix']
+
+
+@traced
+class StratifiedSampler:
+    """Proportional stratified samples for interactive exploration of large datasets, with error bounds.
+
+    Strata are the combinations of the sensitive columns (numeric ones binned as in the bias analysis)
+    and the binary targets, so every group keeps its share of rows and of positive outcomes. Quotas are
+    rounded by largest remainder, so each stratum is within one row of its exact share. The bounds
+    assume simple random sampling within each group (with a finite population correction), which is
+    conservative for a stratified sample.
+    """
+
+    def __init__(self, max_rows=50000, max_strata=5000, seed=0):
+        self.max_rows = max_rows
+        self.max_strata = max_strata
+        self.seed = seed
+
+    def strata_columns(self, df):
+        """Sensitive columns followed by binary targets, dropping targets while there are too many strata."""
+        columns = list(dict.fromkeys(DataProcessor().detect_sensitive_columns(df) + get_schema(df).binary_targets()))
+        while len(columns) > 1 and self._strata_codes(df, columns)[1] > self.max_strata:
+            columns = columns[:-1]
+        return columns
+
+    def sample(self, df, strata=None):
+        """At most ``max_rows`` rows with every stratum represented in proportion, in their original order."""
+        if len(df) <= self.max_rows:
+            return df
+        strata = self.strata_columns(df) if strata is None else strata
+        codes, n_strata = self._strata_codes(df, strata)
+        sizes = np.bincount(codes, minlength=n_strata)
+        exact = sizes * self.max_rows / len(df)
+        quotas = np.floor(exact).astype(int)
+        # Largest remainder: the rows left over go to the strata that lost the most to rounding
+        leftover = self.max_rows - quotas.sum()
+        quotas[np.argsort(quotas - exact, kind='stable')[:leftover]] += 1
+
+        rng = np.random.default_rng(self.seed)
+        order = rng.permutation(len(df))
+        shuffled = codes[order]
+        rank = pd.Series(shuffled).groupby(shuffled).cumcount().to_numpy()
+        keep = np.sort(order[rank < quotas[shuffled]])
+        return df.iloc[keep]
+
+    def fairness_bounds(self, sample, sensitive_col, target_col, population_rows, confidence=0.95):
+        """Intervals for the per-group selection rates and Disparate Impact estimated from ``sample``.
+
+        The group intervals hold simultaneously (Bonferroni), so Disparate Impact lies between the
+        smallest lower bound over the largest upper bound and the reverse with at least ``confidence``.
+        """
+        groups = BiasAnalyzer().bin_continuous_column(sample[sensitive_col])
+        outcome = sample[target_col].astype(float)
+        valid = groups.notna() & outcome.notna()
+        stats = outcome[valid].groupby(groups[valid], observed=True).agg(['mean', 'count'])
+        if len(stats) < 2:
+            return {}
+        rates, counts = stats['mean'].to_numpy(), stats['count'].to_numpy()
+        z = norm.ppf(1 - (1 - confidence) / (2 * len(rates)))
+        fpc = max(0.0, 1 - len(sample) / population_rows) if population_rows else 1.0
+        margins = z * np.sqrt(rates * (1 - rates) / counts * fpc)
+        low, high = np.clip(rates - margins, 0, 1), np.clip(rates + margins, 0, 1)
+        return {
+            'Disparate Impact': (low.min() / high.max() if high.max() > 0 else np.nan, min(1.0, high.min() / low.max()) if low.max() > 0 else 1.0),
+            'Selection Rate by Group': {group: (lo, hi) for group, lo, hi in zip(stats.index, low, high)}
+        }
+
+    def summary_bounds(self, summary, population_rows, confidence=0.95):
+        """Margin of error of each column mean in a :class:`StatsEngine` summary of the sample."""
+        count = summary['count'].astype(float)
+        fpc = np.clip(1 - count / population_rows, 0, 1) if population_rows else 1.0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return norm.ppf(1 - (1 - confidence) / 2) * summary['std'] / np.sqrt(count) * np.sqrt(fpc)
+
+    def _strata_codes(self, df, columns):
+        if not columns:
+            return np.zeros(len(df), dtype=np.int64), 1
+        analyzer = BiasAnalyzer()
+        keys = pd.DataFrame({col: analyzer.bin_continuous_column(df[col]) if df[col].nunique() > 2 else df[col] for col in columns})
+        codes = keys.groupby(columns, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+        return codes, int(codes.max()) + 1 if len(codes) else 0
+
+
+@traced
+class ExactWorker:
+    """Runs the analysis stages on all rows in a background thread while pages render from a sample.
+
+    It uses its own pipeline, which neither writes to the session nor reports to a page (errors are
+    kept in ``error``), and also warms the statistics cache. Pages wait for it in
+    :func:`refresh_approximate_mode` and, once it has finished, :func:`sync_approximate_mode` hands
+    the results to the session pipeline.
+    """
+
+    def __init__(self, df, params=None, stages=None):
+        self.df = df
+        self.stages = list(stages or EXACT_STAGES)
+        self.pipeline = Pipeline(mirror=False, report_errors=False)
+        self.pipeline.params.update(params or {})
+        if 'target_col' in self.pipeline.params:
+            self.stages.append('fairness')
+        self.error = None
+        self.finished = False
+        # Not attached to the script run: the run that started it is over long before it finishes
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __getstate__(self):
+        if not self.done():
+            raise TypeError("A running ExactWorker cannot be pickled.")
+        state = dict(self.__dict__)
+        state['_thread'] = None
+        return state
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def done(self):
+        return self._thread is None or self.finished or not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done()
+
+    def _run(self):
+        try:
+            self.pipeline.set_source(self.df)
+            results = self.pipeline.run(self.stages)
+            StatsEngine(report_errors=False).summarize(results['clean']['cleaned_df'])
+        except Exception as e:
+            self.error = e
+        self.finished = True
+
+
+def start_approximate_mode(df, sampler=None):
+    """Return a stratified sample of ``df`` for the pages and start the exact computation in the background.
+
+    A new worker is started only when the uploaded data changes; once the exact results have been
+    swapped in, ``df`` itself is returned.
+    """
+    sampler = sampler or StratifiedSampler()
+    key = fingerprint(df)
+    state = st.session_state.get('approximate')
+    if state is None or state['key'] != key:
+        state = {
+            'key': key,
+            'sample': sampler.sample(df),
+            'rows': len(df),
+            'worker': ExactWorker(df, get_pipeline().params).start(),
+            'swapped': False
+        }
+        st.session_state.approximate = state
+    return df if state['swapped'] else state['sample']
+
+
+def stop_approximate_mode():
+    st.session_state.approximate = None
+
+
+def approximate_state():
+    """The approximate-mode state while pages still show sample estimates, else None."""
+    state = st.session_state.get('approximate')
+    return state if state and not state['swapped'] else None
+
+
+def sync_approximate_mode(wait=False):
+    """Swap in the exact results if the background worker has finished, otherwise flag the page as approximate.
+
+    Called at the top of every page; with ``wait=True`` it blocks until the exact results are ready.
+    """
+    state = approximate_state()
+    if state is None:
+        return
+    worker = state['worker']
+    if wait and not worker.done():
+        with st.spinner(f"Computing exact results on all {state['rows']:,} rows..."):
+            worker.wait()
+    if not worker.done():
+        st.info(f"Showing estimates from a stratified sample of {len(state['sample']):,} of {state['rows']:,} rows. Exact results are being computed in the background; the page refreshes when they are ready.", icon="ℹ️")
+        return
+    if worker.error is not None:
+        st.error(f"Error computing exact results: {str(worker.error)}", icon="❌")
+        state['swapped'] = True
+        return
+    pipeline = get_pipeline()
+    pipeline.adopt(worker.pipeline)
+    pipeline.set_source(worker.df)
+    # Everything computed in the background is a cache hit; only a selected target's metrics may need work
+    pipeline.run(worker.stages + (['fairness'] if 'target_col' in pipeline.params and 'fairness' not in worker.stages else []))
+    state['swapped'] = True
+    st.success(f"Exact results on all {state['rows']:,} rows are now shown.", icon="✅")
+
+
+def refresh_approximate_mode(poll=2.0):
+    """Rerun the page while the exact results are still being computed; call at the bottom of every page.
+
+    Waits up to ``poll`` seconds for the background worker, so the page refreshes as soon as it
+    finishes. A widget change during the wait still takes effect: its rerun is kept in preference to
+    this one.
+    """
+    state = approximate_state()
+    if state is None:
+        return
+    state['worker'].wait(poll)
+    st.experimental_rerun()
\ No newline at end of file
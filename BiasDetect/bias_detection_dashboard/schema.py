@@ -0,0 +1,157 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+NUMERIC = 'numeric'
+CATEGORICAL = 'categorical'
+BINARY = 'binary'
+IDENTIFIER = 'identifier'
+FREE_TEXT = 'free_text'
+OTHER = 'other'
+
+_schemas = {}
+
+
+def _signature(df):
+    return tuple((col, str(dtype)) for col, dtype in df.dtypes.items())
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _is_text(series):
+    return (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype))
+
+
+class DatasetSchema:
+    """Role of every column (numeric, categorical, binary, identifier, free text), inferred once per dataset.
+
+    Modules ask the schema for column groups instead of filtering on concrete dtypes, so compact
+    representations (int8/int32, float32, category, Arrow strings) never drop columns out of an analysis.
+    """
+
+    def __init__(self, kinds, binary_values, numeric, text, signature):
+        self.kinds = kinds
+        self.binary_values = binary_values
+        self.numeric = numeric
+        self.text = text
+        self.signature = signature
+
+    @classmethod
+    def infer(cls, df, max_categories=50, category_ratio=0.05):
+        kinds = {}
+        binary_values = {}
+        n_rows = len(df)
+        for col in df.columns:
+            series = df[col]
+            values = series.dropna()
+            n_unique = values.nunique()
+            if pd.api.types.is_bool_dtype(series) or (n_unique == 2 and (_is_numeric(series) or _is_text(series))):
+                kinds[col] = BINARY
+                binary_values[col] = frozenset(values.unique().tolist())
+            elif _is_numeric(series):
+                is_key = (pd.api.types.is_integer_dtype(series) and n_unique == len(values) and n_rows > 1
+                          and (str(col).lower().endswith('id') or values.is_monotonic_increasing))
+                kinds[col] = IDENTIFIER if is_key else NUMERIC
+            elif _is_text(series):
+                if n_unique <= max_categories or n_unique <= category_ratio * len(values):
+                    kinds[col] = CATEGORICAL
+                else:
+                    sample = values.astype(str).head(1000)
+                    long_text = sample.str.len().mean() > 40 or sample.str.count(' ').mean() > 3
+                    kinds[col] = FREE_TEXT if long_text else IDENTIFIER
+            else:
+                kinds[col] = OTHER
+        numeric = [col for col in df.columns if _is_numeric(df[col])]
+        text = [col for col in df.columns if _is_text(df[col])]
+        return cls(kinds, binary_values, numeric, text, _signature(df))
+
+    def kind(self, col):
+        return self.kinds.get(col, OTHER)
+
+    def columns(self, *kinds):
+        return [col for col, kind in self.kinds.items() if kind in kinds]
+
+    def numeric_columns(self):
+        """Columns with a numeric (non-boolean) dtype of any width."""
+        return list(self.numeric)
+
+    def text_columns(self):
+        """String-valued columns of any representation: object, category or Arrow strings."""
+        return list(self.text)
+
+    def categorical_columns(self):
+        """Text columns that hold a small set of groups (categorical or binary), excluding identifiers and free text."""
+        return [col for col in self.text if self.kinds[col] in (CATEGORICAL, BINARY)]
+
+    def binary_targets(self):
+        """Binary columns whose two values are 0 and 1."""
+        return [col for col, values in self.binary_values.items() if values <= {0, 1}]
+
+    def compact(self, df):
+        """Return a copy of ``df`` with every column stored in the most compact lossless dtype."""
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            kind = self.kinds.get(col, OTHER)
+            if col in self.numeric:
+                columns[col] = _downcast(series, flag=kind == BINARY)
+            elif kind in (CATEGORICAL, BINARY) and _is_text(series):
+                columns[col] = series.astype('category')
+            elif kind in (IDENTIFIER, FREE_TEXT) and pd.api.types.is_object_dtype(series):
+                # Arrow-backed strings avoid one Python object per cell
+                columns[col] = series.astype('string[pyarrow]') if _all_strings(series) else series
+            else:
+                columns[col] = series
+        compacted = pd.DataFrame(columns, index=df.index)
+        register(compacted, DatasetSchema(self.kinds, self.binary_values, self.numeric, self.text, _signature(compacted)))
+        return compacted
+
+
+def _downcast(series, flag=False):
+    if pd.api.types.is_integer_dtype(series):
+        narrowed = pd.to_numeric(series, downcast='integer')
+        # Only 0/1 flags go below int32; narrower measures would silently wrap in later arithmetic
+        if flag or narrowed.dtype.itemsize >= 4:
+            return narrowed
+        return narrowed.astype(np.int32) if series.dtype.itemsize > 4 else series
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        if values.dtype == np.float32:
+            return series
+        # Whole-number floats (integers with missing values) and values exactly representable in float32 shrink losslessly
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def _all_strings(series):
+    return pd.api.types.infer_dtype(series, skipna=True) == 'string'
+
+
+def register(df, schema):
+    key = id(df)
+
+    def forget(ref):
+        if _schemas.get(key, (None,))[0] is ref:
+            del _schemas[key]
+    _schemas[key] = (weakref.ref(df, forget), schema)
+
+
+def invalidate(df):
+    """Forget the schema of a frame whose values were changed in place (e.g. by cleaning)."""
+    _schemas.pop(id(df), None)
+
+
+def get_schema(df):
+    """Schema of ``df``, inferred on first use and reused until the frame's columns or dtypes change."""
+    cached = _schemas.get(id(df))
+    if cached is not None and cached[0]() is df and cached[1].signature == _signature(df):
+        return cached[1]
+    schema = DatasetSchema.infer(df)
+    register(df, schema)
+    return schema
\ No newline at end of file
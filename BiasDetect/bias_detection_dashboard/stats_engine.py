@@ -0,0 +1,277 @@
+import argparse
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dataset_store import fingerprint
+from schema import get_schema
+from tracer import traced
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class Moments:
+    """Count, mean, central moment sums M2..M4, min and max per column, mergeable across chunks (Pébay 2008)."""
+
+    def __init__(self, n, mean, m2, m3, m4, minimum, maximum):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.m3 = m3
+        self.m4 = m4
+        self.min = minimum
+        self.max = maximum
+
+    @classmethod
+    def from_array(cls, values):
+        """Exact two-pass moments of one chunk; ``values`` is rows x columns with NaN for missing."""
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.nansum(values, axis=0) / n, 0.0)
+        delta = np.where(valid, values - mean, 0.0)
+        delta2 = delta * delta
+        empty = np.full(values.shape[1], np.nan)
+        return cls(
+            n, mean, delta2.sum(axis=0), (delta2 * delta).sum(axis=0), (delta2 * delta2).sum(axis=0),
+            np.nanmin(values, axis=0, initial=np.inf, where=valid) if len(values) else empty,
+            np.nanmax(values, axis=0, initial=-np.inf, where=valid) if len(values) else empty
+        )
+
+    def merge(self, other):
+        n = self.n + other.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(n > 0, other.mean - self.mean, 0.0)
+            share_a = np.where(n > 0, self.n / n, 0.0)
+            share_b = np.where(n > 0, other.n / n, 0.0)
+        mean = self.mean + delta * share_b
+        m2 = self.m2 + other.m2 + delta ** 2 * self.n * share_b
+        m3 = (self.m3 + other.m3 + delta ** 3 * self.n * share_b * (share_a - share_b)
+              + 3 * delta * (share_a * other.m2 - share_b * self.m2))
+        m4 = (self.m4 + other.m4 + delta ** 4 * self.n * share_b * (share_a ** 2 - share_a * share_b + share_b ** 2)
+              + 6 * delta ** 2 * (share_a ** 2 * other.m2 + share_b ** 2 * self.m2)
+              + 4 * delta * (share_a * other.m3 - share_b * self.m3))
+        return Moments(n, mean, m2, m3, m4, np.fmin(self.min, other.min), np.fmax(self.max, other.max))
+
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
+
+    def skewness(self):
+        """Adjusted Fisher-Pearson skewness, as ``DataFrame.skew``."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+            return np.where((n > 2) & (self.m2 > 0), g1 * np.sqrt(n * (n - 1)) / (n - 2), np.where(n > 2, 0.0, np.nan))
+
+    def kurtosis(self):
+        """Bias-corrected excess kurtosis, as ``DataFrame.kurtosis``."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g2 = n * self.m4 / self.m2 ** 2 - 3
+            return np.where((n > 3) & (self.m2 > 0), ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)), np.where(n > 3, 0.0, np.nan))
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang & Liberty 2016) for one column.
+
+    Level ``h`` holds items of weight ``2**h``; an over-full level is sorted and every other item is
+    promoted. With ``k=200`` the rank error is about 1%. Until the first compaction the sketch holds
+    every value and answers exactly, with the same linear interpolation as pandas.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        return items[order][np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)]
+
+    def _capacity(self, h):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - h - 1))))
+
+    def _compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for h in range(len(self.levels)):
+                if len(self.levels[h]) <= self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[h])
+                leftover = items[-1:] if len(items) % 2 else items[:0]
+                items = items[:len(items) - len(leftover)]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[self._rng.integers(2)::2]])
+                self.levels[h] = leftover
+                compacted = True
+
+
+def _partial(values, k, sketch):
+    """Moments (and optionally one KLL sketch per column) of one chunk; runs in threads or worker processes."""
+    moments = Moments.from_array(values)
+    sketches = [KLLSketch(k, seed=i).update(values[:, i]) for i in range(values.shape[1])] if sketch else None
+    return moments, sketches
+
+
+def _partial_frame(args):
+    chunk, columns, k = args
+    return _partial(chunk[columns].to_numpy(dtype=float, na_value=np.nan), k, True)
+
+
+@traced
+class StatsEngine:
+    """Summary statistics from mergeable per-chunk moments and quantile sketches.
+
+    In-memory frames are split into ``chunk_rows`` shards summarised in parallel threads and merged;
+    quantiles are exact (a linear-time selection) up to ``exact_rows`` rows and come from KLL sketches
+    beyond that. CSV files are streamed through a process pool, so they never have to fit in memory.
+    Results for in-memory frames are cached per dataset fingerprint.
+    """
+
+    def __init__(self, chunk_rows=250000, workers=None, k=200, exact_rows=2000000, cache_size=32, report_errors=True):
+        self.chunk_rows = chunk_rows
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.k = k
+        self.exact_rows = exact_rows
+        self.cache_size = cache_size
+        self.report_errors = report_errors
+
+    def summarize(self, df, columns=None):
+        """count, mean, std, min, quartiles, max, skewness and kurtosis per numeric column.
+
+        Each call returns its own copy, so callers may modify the result without touching the cache.
+        """
+        try:
+            columns = columns or get_schema(df).numeric_columns()
+            key = (fingerprint(df), tuple(columns), self.k, self.exact_rows)
+            with _cache_lock:
+                if key in _cache:
+                    _cache.move_to_end(key)
+                    return _cache[key].copy()
+
+            exact = len(df) <= self.exact_rows
+            shards = [df[columns].iloc[start:start + self.chunk_rows].to_numpy(dtype=float, na_value=np.nan) for start in range(0, max(len(df), 1), self.chunk_rows)]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                partials = list(pool.map(lambda values: _partial(values, self.k, not exact), shards))
+            if exact:
+                quantiles = np.array([
+                    df[col].quantile(QUANTILES).to_numpy(dtype=float) if df[col].notna().any() else np.full(len(QUANTILES), np.nan)
+                    for col in columns
+                ])
+            else:
+                quantiles = None
+            summary = self._finish(columns, partials, quantiles)
+            with _cache_lock:
+                _cache[key] = summary
+                while len(_cache) > self.cache_size:
+                    _cache.popitem(last=False)
+            return summary.copy()
+        except Exception as e:
+            if not self.report_errors:
+                raise
+            st.error(f"Error computing statistics: {str(e)}", icon="❌")
+            return pd.DataFrame()
+
+    def describe(self, df, columns=None):
+        """Drop-in for ``df.describe().T`` on numeric columns."""
+        summary = self.summarize(df, columns)
+        return summary.drop(columns=['skewness', 'kurtosis'], errors='ignore')
+
+    def summarize_csv(self, path, columns=None, progress_callback=None):
+        """Summarise a CSV of any size chunk by chunk; quantiles come from merged KLL sketches."""
+        reader = pd.read_csv(path, chunksize=self.chunk_rows)
+        partials = []
+        pending = deque()
+        rows_done = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in reader:
+                if columns is None:
+                    columns = get_schema(chunk).numeric_columns()
+                pending.append((len(chunk), pool.submit(_partial_frame, (chunk, columns, self.k))))
+                # Bound the chunks held in memory while workers catch up
+                while len(pending) >= 2 * self.workers:
+                    rows, future = pending.popleft()
+                    partials.append(future.result())
+                    rows_done += rows
+                    if progress_callback:
+                        progress_callback(rows_done)
+                    partials = [self._reduce(partials)]
+            while pending:
+                rows, future = pending.popleft()
+                partials.append(future.result())
+                rows_done += rows
+                if progress_callback:
+                    progress_callback(rows_done)
+        return self._finish(columns or [], partials, None)
+
+    def _reduce(self, partials):
+        moments, sketches = partials[0]
+        for other_moments, other_sketches in partials[1:]:
+            moments = moments.merge(other_moments)
+            if sketches is not None:
+                sketches = [sketch.merge(other) for sketch, other in zip(sketches, other_sketches)]
+        return moments, sketches
+
+    def _finish(self, columns, partials, quantiles):
+        moments, sketches = self._reduce(partials)
+        if quantiles is None:
+            quantiles = np.array([sketch.quantiles(QUANTILES) for sketch in sketches]) if sketches else np.empty((0, len(QUANTILES)))
+        empty = moments.n == 0
+        summary = pd.DataFrame({
+            'count': moments.n,
+            'mean': np.where(empty, np.nan, moments.mean),
+            'std': moments.std(),
+            'min': np.where(empty, np.nan, moments.min)
+        }, index=columns)
+        for i, q in enumerate(QUANTILES):
+            summary[f"{q:.0%}"] = quantiles[:, i] if len(columns) else []
+        summary['max'] = np.where(empty, np.nan, moments.max)
+        summary['skewness'] = moments.skewness()
+        summary['kurtosis'] = moments.kurtosis()
+        return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summary statistics of a CSV file that may not fit in memory.")
+    parser.add_argument('source', help="Input CSV file.")
+    parser.add_argument('--chunk-rows', type=int, default=250000)
+    parser.add_argument('--workers', type=int, default=None, help="Size of the process pool.")
+    parser.add_argument('--k', type=int, default=200, help="KLL sketch size; larger is more accurate.")
+    args = parser.parse_args()
+    engine = StatsEngine(chunk_rows=args.chunk_rows, workers=args.workers, k=args.k)
+    print(engine.summarize_csv(args.source, progress_callback=lambda rows: print(f"{rows} rows read", end='\r')).to_string())
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The dashboard modules import each other as top-level modules, as they do under `streamlit run app.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
\ No newline at end of file
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from imputer import GROUP_MEAN, KNN, Imputer
+
+
+def _income_by_age(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Gender': rng.choice(['Female', 'Male'], rows),
+        'Age': rng.integers(20, 65, rows).astype(float),
+        'Score': rng.normal(0, 1, rows)
+    })
+    df['Income'] = 1000 * df['Age'] + rng.normal(0, 100, rows)
+    truth = df['Income'].copy()
+    missing = rng.random(rows) < 0.2
+    df.loc[missing, 'Income'] = np.nan
+    df.loc[rng.random(rows) < 0.05, 'Score'] = np.nan
+    return df, truth, missing
+
+
+def test_knn_recovers_target_from_other_features():
+    df, truth, missing = _income_by_age()
+    knn, group_mean = df.copy(), df.copy()
+    Imputer(KNN).fill(knn, ['Gender'])
+    Imputer(GROUP_MEAN).fill(group_mean, ['Gender'])
+
+    knn_error = (knn.loc[missing, 'Income'] - truth[missing]).abs().mean()
+    group_error = (group_mean.loc[missing, 'Income'] - truth[missing]).abs().mean()
+    assert not knn.isna().any().any()
+    assert knn_error < 500
+    assert knn_error < group_error / 10
+
+
+def test_knn_leaves_observed_values_alone():
+    df, truth, missing = _income_by_age()
+    filled = df.copy()
+    Imputer(KNN).fill(filled, ['Gender'])
+    pd.testing.assert_series_equal(filled.loc[~missing, 'Income'], truth[~missing])
\ No newline at end of file
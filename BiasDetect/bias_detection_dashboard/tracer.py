@@ -0,0 +1,180 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+class StageTracer:
+    """Process-wide recorder of wall time, CPU time, peak memory and input size per stage call."""
+
+    def __init__(self, max_records=20000):
+        self.enabled = os.environ.get('BIAS_DASHBOARD_TRACE', '0') == '1'
+        self.track_memory = os.environ.get('BIAS_DASHBOARD_TRACE_MEMORY', '1') == '1'
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        if self.enabled:
+            self.enable(self.track_memory)
+
+    def enable(self, track_memory=True):
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not track_memory and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def call(self, stage, func, args, kwargs):
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        # Peak memory is only meaningful for the outermost stage: nested stages would reset it.
+        measure_memory = depth == 0 and tracemalloc.is_tracing()
+        if measure_memory:
+            tracemalloc.reset_peak()
+            base_memory = tracemalloc.get_traced_memory()[0]
+        status = 'ok'
+        start = time.time()
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            peak = tracemalloc.get_traced_memory()[1] - base_memory if measure_memory else None
+            self._local.depth = depth
+            rows, nbytes = _input_size(args[1:], kwargs)
+            ctx = get_script_run_ctx()
+            record = {
+                'stage': stage,
+                'session': ctx.session_id if ctx is not None else 'background',
+                'thread': threading.get_ident(),
+                'start': start,
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'peak_mem_mb': peak / 1e6 if peak is not None else None,
+                'input_rows': rows,
+                'input_mb': nbytes / 1e6 if nbytes is not None else None,
+                'depth': depth,
+                'status': status
+            }
+            with self._lock:
+                self.records.append(record)
+
+    def to_frame(self, session=None):
+        with self._lock:
+            records = list(self.records)
+        df = pd.DataFrame(records, columns=['stage', 'session', 'thread', 'start', 'wall_s', 'cpu_s', 'peak_mem_mb',
+                                            'input_rows', 'input_mb', 'depth', 'status'])
+        if session is not None:
+            df = df[df['session'] == session]
+        return df
+
+    def summary(self, session=None):
+        """Aggregate recorded calls per stage, slowest stages first."""
+        df = self.to_frame(session)
+        if df.empty:
+            return pd.DataFrame()
+        summary = df.groupby('stage').agg(
+            calls=('wall_s', 'size'),
+            total_wall_s=('wall_s', 'sum'),
+            mean_wall_s=('wall_s', 'mean'),
+            p95_wall_s=('wall_s', lambda s: s.quantile(0.95)),
+            total_cpu_s=('cpu_s', 'sum'),
+            max_peak_mem_mb=('peak_mem_mb', 'max'),
+            max_input_rows=('input_rows', 'max'),
+            errors=('status', lambda s: int((s == 'error').sum()))
+        )
+        return summary.sort_values(by='total_wall_s', ascending=False)
+
+    def to_json(self, session=None):
+        return self.to_frame(session).to_json(orient='records')
+
+    def to_chrome_trace(self, session=None):
+        """Export calls in the Chrome trace event format (load in chrome://tracing or Perfetto)."""
+        df = self.to_frame(session)
+        df = df.astype(object).where(df.notna(), None)
+        pid = os.getpid()
+        events = []
+        for record in df.to_dict(orient='records'):
+            events.append({
+                'name': record['stage'],
+                'cat': record['session'],
+                'ph': 'X',
+                'ts': record['start'] * 1e6,
+                'dur': record['wall_s'] * 1e6,
+                'pid': pid,
+                'tid': record['thread'],
+                'args': {
+                    'cpu_ms': record['cpu_s'] * 1e3,
+                    'peak_mem_mb': record['peak_mem_mb'],
+                    'input_rows': record['input_rows'],
+                    'input_mb': record['input_mb'],
+                    'status': record['status']
+                }
+            })
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=_json_default)
+
+
+def _input_size(args, kwargs):
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, pd.DataFrame):
+            return len(value), int(value.memory_usage(index=False, deep=False).sum())
+        if isinstance(value, pd.Series):
+            return len(value), int(value.memory_usage(index=False, deep=False))
+        size = getattr(value, 'size', None)
+        if isinstance(size, int) and hasattr(value, 'read'):
+            return None, size
+    return None, None
+
+
+def _json_default(value):
+    if pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+tracer = StageTracer()
+
+
+def _wrap(stage, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled:
+            return func(*args, **kwargs)
+        return tracer.call(stage, func, args, kwargs)
+    return wrapper
+
+
+def traced(cls):
+    """Class decorator recording every public method of ``cls`` as a stage when tracing is enabled."""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(attr):
+            continue
+        setattr(cls, name, _wrap(f"{cls.__name__}.{name}", attr))
+    return cls
\ No newline at end of file
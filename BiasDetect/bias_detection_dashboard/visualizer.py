@@ -5,12 +5,18 @@ import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import networkx as nx
+from figure_cache import figure_cache
+from schema import get_schema
+from stats_engine import StatsEngine
+from tracer import traced
 
+@traced
 class Visualizer:
     def plot_distributions(self, df, sensitive_cols):
+        numeric_cols = get_schema(df).numeric_columns()
         for col in sensitive_cols:
             st.markdown(f"<div class='section-title slide-in'>Distribution of {col}</div>", unsafe_allow_html=True)
-            if df[col].dtype in ['int64', 'float64']:
+            if col in numeric_cols:
                 fig = px.histogram(df, x=col, title=f"Histogram of {col}", nbins=30, color_discrete_sequence=['#3B82F6'])
                 fig.update_traces(marker=dict(line=dict(width=1, color='DarkSlateGrey')))
             else:
@@ -32,7 +38,7 @@ class Visualizer:
 
     def plot_correlation_heatmap(self, df):
         st.markdown("<div class='section-title slide-in'>Correlation Heatmap</div>", unsafe_allow_html=True)
-        num_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        num_cols = get_schema(df).numeric_columns()
         if len(num_cols) > 1:
             corr = df[num_cols].corr()
             fig = px.imshow(corr, text_auto=True, aspect="auto", title="Correlation Heatmap", color_continuous_scale='RdBu_r')
@@ -43,17 +49,23 @@ class Visualizer:
 
     def plot_statistical_summary(self, df):
         st.markdown("<div class='section-title slide-in'>Statistical Summary</div>", unsafe_allow_html=True)
-        stats = df.describe().T
+        stats = StatsEngine().describe(df)
         st.write(stats)
 
     def plot_data_flow(self, df):
         st.markdown("<div class='section-title slide-in'>Data Flow Diagram</div>", unsafe_allow_html=True)
+        # The diagram depends only on the leading column names, so the layout is computed once per schema
+        columns = list(df.columns[:5])
+        fig = figure_cache.figure('data_flow', columns, lambda: self.data_flow_figure(columns))
+        st.plotly_chart(fig, use_container_width=True)
+
+    def data_flow_figure(self, columns):
         G = nx.DiGraph()
-        for col in df.columns[:5]:  # Limit for visualization clarity
+        for col in columns:  # Limit for visualization clarity
             G.add_node(col)
-        for i in range(len(df.columns[:5])-1):
-            G.add_edge(df.columns[i], df.columns[i+1])
-        pos = nx.spring_layout(G)
+        for i in range(len(columns)-1):
+            G.add_edge(columns[i], columns[i+1])
+        pos = nx.spring_layout(G, seed=42)
         edge_x, edge_y = [], []
         for edge in G.edges():
             x0, y0 = pos[edge[0]]
@@ -74,15 +86,19 @@ class Visualizer:
             plot_bgcolor='white',
             paper_bgcolor='white'
         )
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
 
     def plot_fairness_metrics(self, metrics, sensitive_col):
         if not metrics or 'selection_rate' not in metrics.get('Selection Rate by Group', {}):
             st.warning(f"Cannot plot fairness metrics for {sensitive_col}: Selection rate data is missing.", icon="⚠️")
             return
 
-        fig = go.Figure()
         selection_rates = metrics['Selection Rate by Group']['selection_rate']
+        fig = figure_cache.figure('fairness_metrics', (sensitive_col, list(selection_rates.items())), lambda: self.fairness_metrics_figure(selection_rates, sensitive_col))
+        st.plotly_chart(fig, use_container_width=True)
+
+    def fairness_metrics_figure(self, selection_rates, sensitive_col):
+        fig = go.Figure()
         fig.add_trace(go.Bar(
             x=list(selection_rates.keys()),
             y=list(selection_rates.values()),
@@ -98,4 +114,167 @@ class Visualizer:
             paper_bgcolor='white',
             transition_duration=500
         )
+        return fig
+
+    def plot_comparative_fairness(self, fairness_metrics, sensitive_cols):
+        selection_rates = {
+            col: metrics['Selection Rate by Group']['selection_rate']
+            for col, metrics in fairness_metrics.items()
+            if 'Selection Rate by Group' in metrics and 'selection_rate' in metrics['Selection Rate by Group']
+        }
+        params = ([(col, list(rates.items())) for col, rates in selection_rates.items()], sensitive_cols[:1])
+        fig = figure_cache.figure('comparative_fairness', params, lambda: self.comparative_fairness_figure(selection_rates, sensitive_cols))
+        st.plotly_chart(fig, use_container_width=True)
+
+    def comparative_fairness_figure(self, selection_rates, sensitive_cols):
+        fig = go.Figure()
+        for col, rates in selection_rates.items():
+            fig.add_trace(go.Bar(
+                x=list(rates.values()),
+                y=list(rates.keys()),
+                name=col,
+                orientation='h',
+                marker_color='#3B82F6' if col == sensitive_cols[0] else '#10B981'
+            ))
+        fig.add_vline(x=0.8, line_dash="dash", line_color="#EF4444", annotation_text="Fairness Threshold")
+        fig.update_layout(
+            title="Comparative Selection Rates Across Sensitive Features",
+            xaxis_title="Selection Rate",
+            yaxis_title="Groups",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            barmode='group'
+        )
+        return fig
+
+    def plot_readiness_gauge(self, score):
+        score = round(float(score), 2)
+        fig = figure_cache.figure('readiness_gauge', score, lambda: self.readiness_gauge_figure(score))
+        st.plotly_chart(fig, use_container_width=True)
+
+    def readiness_gauge_figure(self, score):
+        return go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=score,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            title={'text': "ML Readiness Score (%)"},
+            gauge={
+                'axis': {'range': [0, 100]},
+                'bar': {'color': "#3B82F6"},
+                'steps': [
+                    {'range': [0, 50], 'color': "#EF4444"},
+                    {'range': [50, 75], 'color': "#F59E0B"},
+                    {'range': [75, 100], 'color': "#10B981"}
+                ],
+                'threshold': {
+                    'line': {'color': "black", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 80
+                }
+            }
+        ))
+
+    def plot_binning_sweep(self, sweep, sensitive_col):
+        if sweep.empty:
+            st.warning(f"Cannot plot binning sensitivity for {sensitive_col}: no schemes were evaluated.", icon="⚠️")
+            return
+
+        fig = go.Figure()
+        colors = {'equal_width': '#3B82F6', 'quantile': '#10B981', 'custom': '#F59E0B'}
+        for strategy, group in sweep.groupby('Strategy', sort=False):
+            fig.add_trace(go.Scatter(
+                x=group['Bins'],
+                y=group['Disparate Impact'],
+                mode='lines+markers' if strategy != 'custom' else 'markers',
+                name=strategy.replace('_', ' ').title(),
+                marker=dict(size=10 if strategy == 'custom' else 6, color=colors.get(strategy, '#6B7280'))
+            ))
+        fig.add_hline(y=0.8, line_dash="dash", line_color="#EF4444", annotation_text="Fairness Threshold")
+        fig.update_layout(
+            title=f"Disparate Impact of {sensitive_col} by Binning Scheme",
+            xaxis_title="Number of Bins",
+            yaxis_title="Disparate Impact",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            transition_duration=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_proxy_attribution(self, attribution):
+        if attribution.empty:
+            st.warning("Cannot plot proxy attribution: no sensitive column could be modelled.", icon="⚠️")
+            return
+
+        fig = px.imshow(attribution.T, text_auto='.2f', aspect="auto", title="Feature Attribution for Predicting Sensitive Columns", color_continuous_scale='Blues')
+        fig.update_layout(xaxis_title="Feature", yaxis_title="Sensitive Column", plot_bgcolor='white', paper_bgcolor='white')
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_fairness_matrix(self, matrix, metric='Disparate Impact'):
+        if matrix.empty:
+            st.warning("Cannot plot fairness matrix: no target and sensitive column pairs were evaluated.", icon="⚠️")
+            return
+
+        grid = matrix.pivot(index='Target', columns='Sensitive Column', values=metric)
+        fig = px.imshow(grid, text_auto='.2f', aspect="auto", title=f"{metric} by Target and Sensitive Column", color_continuous_scale='RdYlGn', zmin=0, zmax=1)
+        fig.update_layout(xaxis_title="Sensitive Column", yaxis_title="Target", plot_bgcolor='white', paper_bgcolor='white')
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_counterfactual_shift(self, summary):
+        if summary.empty:
+            st.warning("Cannot plot counterfactual results: no sensitive column was tested.", icon="⚠️")
+            return
+
+        fig = px.bar(summary, x='Group', y='Changed Predictions (%)', color='Sensitive Column', barmode='group',
+                     hover_data=['Rows', 'Mean Probability Shift', 'Max Probability Shift'],
+                     title="Predictions That Change When Only the Sensitive Attribute Changes",
+                     color_discrete_sequence=['#3B82F6', '#10B981', '#F59E0B', '#EF4444'])
+        fig.update_layout(xaxis_title="Group", yaxis_title="Changed Predictions (%)", plot_bgcolor='white', paper_bgcolor='white')
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_pareto_frontier(self, results):
+        if results.empty:
+            st.warning("Cannot plot the fairness-accuracy frontier: no mitigation candidate was trained.", icon="⚠️")
+            return
+
+        fig = px.scatter(results, x='Disparate Impact', y='Accuracy', color='Method', symbol='Constraint',
+                         hover_data=['Bound', 'Equalized Odds', 'Selection Rate'],
+                         title="Fairness-Accuracy Trade-off of Mitigation Strategies",
+                         color_discrete_sequence=['#3B82F6', '#10B981', '#F59E0B', '#EF4444'])
+        frontier = results[results['Pareto Optimal']].sort_values(by='Disparate Impact')
+        fig.add_trace(go.Scatter(x=frontier['Disparate Impact'], y=frontier['Accuracy'], mode='lines', name='Pareto Frontier', line=dict(color='#6B7280', dash='dot')))
+        fig.add_vline(x=0.8, line_dash="dash", line_color="#EF4444", annotation_text="Fairness Threshold")
+        fig.update_layout(xaxis_title="Disparate Impact", yaxis_title="Accuracy", plot_bgcolor='white', paper_bgcolor='white')
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_threshold_curves(self, sweep, sensitive_col):
+        if sweep.empty:
+            st.warning(f"Cannot plot threshold curves for {sensitive_col}: no thresholds were evaluated.", icon="⚠️")
+            return
+
+        fig = go.Figure()
+        for metric, color in [('Disparate Impact', '#3B82F6'), ('Equalized Odds', '#10B981'), ('Accuracy', '#F59E0B'), ('Selection Rate', '#6B7280')]:
+            fig.add_trace(go.Scatter(x=sweep['Threshold'], y=sweep[metric], mode='lines', name=metric, line=dict(color=color)))
+        fig.add_hline(y=0.8, line_dash="dash", line_color="#EF4444", annotation_text="Fairness Threshold")
+        fig.update_layout(
+            title=f"Fairness and Accuracy by Threshold ({sensitive_col})",
+            xaxis_title="Score Threshold",
+            yaxis_title="Value",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            transition_duration=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        group_cols = [col for col in sweep.columns if col.startswith('Selection Rate (')]
+        fig = go.Figure()
+        for col in group_cols:
+            fig.add_trace(go.Scatter(x=sweep['Threshold'], y=sweep[col], mode='lines', name=col[len('Selection Rate ('):-1]))
+        fig.update_layout(
+            title=f"Selection Rate by {sensitive_col} Group",
+            xaxis_title="Score Threshold",
+            yaxis_title="Selection Rate",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            transition_duration=500
+        )
         st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file